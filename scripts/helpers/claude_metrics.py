@@ -3,19 +3,35 @@ from __future__ import annotations
 import argparse
 import json
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
 from pathlib import Path
-from typing import Iterable, Iterator, Mapping, Sequence
+from typing import Callable, Iterable, Iterator, Mapping, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:  # pragma: no cover - optional speedup
+    simdjson = None
 
 Number = int | float
 
 
+def _loads(raw: bytes | str) -> object:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 @dataclass(frozen=True)
 class Metrics:
     in_tokens: int
     out_tokens: int
     model: str
-    est_cost_usd: Decimal | None = None
+    est_cost_usd: float | None = None
 
     def to_output_pairs(self) -> Iterator[tuple[str, str]]:
         yield "in_tokens", str(self.in_tokens)
@@ -45,6 +61,11 @@ MODEL_PATHS: Sequence[Sequence[str]] = (
     ("meta", "model"),
     ("result", "model"),
 )
+# JSON pointers for every field the aggregation reads; the simdjson path decodes only these.
+FIELD_PATHS: Sequence[Sequence[str]] = (*INPUT_PATHS, *OUTPUT_PATHS, *MODEL_PATHS)
+_FIELD_POINTERS: Sequence[tuple[str, Sequence[str]]] = tuple(
+    ("/" + "/".join(path), path) for path in FIELD_PATHS
+)
 
 
 class MetricsParseError(ValueError):
@@ -56,19 +77,16 @@ def collect_metrics_from_file(
     *,
     costs_json: str | None = None,
     costs_file: Path | str | None = None,
-    fallback_in_rate: Decimal | Number | str | None = None,
-    fallback_out_rate: Decimal | Number | str | None = None,
+    fallback_in_rate: Number | str | None = None,
+    fallback_out_rate: Number | str | None = None,
 ) -> Mapping[str, object]:
     path = Path(execution_path)
-    records = _load_records(path)
-    in_tokens = _sum_fields(records, INPUT_PATHS)
-    out_tokens = _sum_fields(records, OUTPUT_PATHS)
-    model = _pick_model(records)
+    in_tokens, out_tokens, model = _extract_all(_load_records(path))
     cost_map = _load_cost_map(costs_json, costs_file)
     rates = _resolve_rates(model, cost_map, fallback_in_rate, fallback_out_rate)
     est_cost = _estimate_cost(in_tokens, out_tokens, rates)
     if est_cost is not None:
-        est_cost = est_cost.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
+        est_cost = round(est_cost, 6)
     metrics = Metrics(in_tokens=in_tokens, out_tokens=out_tokens, model=model, est_cost_usd=est_cost)
     output: dict[str, object] = {
         "in_tokens": metrics.in_tokens,
@@ -81,77 +99,164 @@ def collect_metrics_from_file(
     return output
 
 
-def _load_records(path: Path) -> list[dict]:
+def _load_records(path: Path) -> Iterator[dict]:
+    """Yield records from a JSON document or NDJSON file without reading it whole."""
     try:
-        raw = path.read_text().strip()
+        handle = path.open("rb")
     except FileNotFoundError as exc:
         raise MetricsParseError(f"Execution file not found: {path}") from exc
-    if not raw:
-        return []
-    try:
-        parsed = json.loads(raw)
-    except json.JSONDecodeError:
-        records: list[dict] = []
-        for line in raw.splitlines():
-            line = line.strip()
-            if not line:
-                continue
+    decode = _decode
+    if simdjson is not None:
+        decode = partial(_decode_projected, simdjson.Parser())
+    with handle:
+        first = next((line.strip() for line in handle if line.strip()), None)
+        if first is None:
+            return
+        if first.startswith(b"["):
+            raw = first + b"\n" + handle.read()
             try:
-                records.append(json.loads(line))
-            except json.JSONDecodeError as exc:  # pragma: no cover
+                records = decode(raw, path, document=True)
+            except MetricsParseError:
+                raise
+            except ValueError:
+                # Not a JSON array after all: read it as NDJSON.
+                records = _decode_lines(decode, raw.splitlines(), path)
+            yield from records
+            return
+        try:
+            records = decode(first, path, document=True)
+        except MetricsParseError:
+            raise
+        except ValueError:
+            # Not NDJSON: a single document spread over several lines.
+            try:
+                records = decode(first + b"\n" + handle.read(), path, document=True)
+            except MetricsParseError:
+                raise
+            except ValueError as exc:
                 raise MetricsParseError(f"Invalid JSON line in {path!s}") from exc
-        if not records:
-            raise MetricsParseError(f"Execution file {path!s} does not contain valid JSON")
-        return records
-    if isinstance(parsed, list):
-        return [item for item in parsed if isinstance(item, dict)]
+        yield from records
+        yield from _decode_lines(decode, handle, path)
+
+
+def _decode_lines(
+    decode: Callable[..., list[dict]], lines: Iterable[bytes], path: Path
+) -> Iterator[dict]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield from decode(line, path)
+        except MetricsParseError:
+            raise
+        except ValueError as exc:
+            raise MetricsParseError(f"Invalid JSON line in {path!s}") from exc
+
+
+def _decode(raw: bytes, path: Path, *, document: bool = False) -> list[dict]:
+    parsed = _loads(raw)
     if isinstance(parsed, dict):
         return [parsed]
+    if not document:
+        return []
+    if isinstance(parsed, list):
+        return [item for item in parsed if isinstance(item, dict)]
     raise MetricsParseError(f"Unexpected payload type in {path!s}: {type(parsed).__name__}")
 
 
-def _sum_fields(records: Iterable[Mapping[str, object]], paths: Sequence[Sequence[str]]) -> int:
-    total = 0
+def _decode_projected(
+    parser: simdjson.Parser, raw: bytes, path: Path, *, document: bool = False
+) -> list[dict]:
+    """Parse with simdjson, materializing only the fields in ``FIELD_PATHS``."""
+    # The parser can only be reused once every proxy into its document is released,
+    # so projections are built here and no proxy outlives this call.
+    doc = parser.parse(raw)
+    if isinstance(doc, simdjson.Object):
+        return [_project(doc)]
+    if not document:
+        return []
+    if isinstance(doc, simdjson.Array):
+        return [_project(item) for item in doc if isinstance(item, simdjson.Object)]
+    raise MetricsParseError(f"Unexpected payload type in {path!s}: {type(doc).__name__}")
+
+
+def _project(doc: simdjson.Object) -> dict:
+    projected: dict = {}
+    for pointer, keys in _FIELD_POINTERS:
+        try:
+            value = doc.at_pointer(pointer)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not isinstance(value, (int, float, str)):
+            continue
+        target = projected
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return projected
+
+
+def _extract_all(records: Iterable[Mapping[str, object]]) -> tuple[int, int, str]:
+    """Sum input/output tokens and pick the last reported model in one pass."""
+    in_tokens = 0
+    out_tokens = 0
+    model = "unknown"
     for record in records:
-        for path in paths:
-            value = _dig(record, path)
+        for getter in _INPUT_GETTERS:
+            value = getter(record)
+            if isinstance(value, (int, float)):
+                in_tokens += int(value)
+                break
+        for getter in _OUTPUT_GETTERS:
+            value = getter(record)
             if isinstance(value, (int, float)):
-                total += int(value)
+                out_tokens += int(value)
                 break
-    return total
+        for getter in _MODEL_GETTERS:
+            value = getter(record)
+            if isinstance(value, str):
+                model = value
+    return in_tokens, out_tokens, model
 
 
-def _pick_model(records: Iterable[Mapping[str, object]]) -> str:
-    model_candidates: list[str] = []
-    for record in records:
-        for path in MODEL_PATHS:
-            value = _dig(record, path)
-            if isinstance(value, str):
-                model_candidates.append(value)
-    return model_candidates[-1] if model_candidates else "unknown"
+_EMPTY: Mapping[str, object] = {}
+
+
+def _compile_getter(path: Sequence[str]) -> Callable[[Mapping[str, object]], object | None]:
+    """Build an inline dict-chain lookup for ``path`` (paths here are at most three deep)."""
+    if len(path) == 1:
+        (key,) = path
+        return lambda record: record.get(key)
+    if len(path) == 2:
+        outer, key = path
+        return lambda record: _as_dict(record.get(outer)).get(key)
+    if len(path) == 3:
+        outer, inner, key = path
+        return lambda record: _as_dict(_as_dict(record.get(outer)).get(inner)).get(key)
+    raise ValueError(f"Unsupported field path: {path!r}")
+
+
+def _as_dict(value: object) -> Mapping[str, object]:
+    return value if isinstance(value, dict) else _EMPTY
 
 
-def _dig(record: Mapping[str, object], path: Sequence[str]) -> object | None:
-    current: object | None = record
-    for key in path:
-        if not isinstance(current, Mapping):
-            return None
-        current = current.get(key)
-    return current
+_INPUT_GETTERS = tuple(_compile_getter(path) for path in INPUT_PATHS)
+_OUTPUT_GETTERS = tuple(_compile_getter(path) for path in OUTPUT_PATHS)
+_MODEL_GETTERS = tuple(_compile_getter(path) for path in MODEL_PATHS)
 
 
 def _load_cost_map(costs_json: str | None, costs_file: Path | str | None) -> dict[str, dict[str, Number]] | None:
     if costs_json:
         try:
-            return json.loads(costs_json)
+            return _loads(costs_json)
         except json.JSONDecodeError as exc:
             raise MetricsParseError("Invalid COSTS_JSON payload") from exc
     if costs_file:
         file_path = Path(costs_file)
         if file_path.is_file():
             try:
-                with file_path.open("r", encoding="utf-8") as fh:
-                    return json.load(fh)
+                return _loads(file_path.read_bytes())
             except json.JSONDecodeError as exc:  # pragma: no cover
                 raise MetricsParseError(f"Invalid JSON in costs file: {costs_file}") from exc
     return None
@@ -160,38 +265,33 @@ def _load_cost_map(costs_json: str | None, costs_file: Path | str | None) -> dic
 def _resolve_rates(
     model: str,
     cost_map: Mapping[str, Mapping[str, Number]] | None,
-    fallback_in_rate: Decimal | Number | str | None,
-    fallback_out_rate: Decimal | Number | str | None,
-) -> tuple[Decimal | None, Decimal | None]:
+    fallback_in_rate: Number | str | None,
+    fallback_out_rate: Number | str | None,
+) -> tuple[float | None, float | None]:
     if cost_map and model in cost_map:
         entry = cost_map[model]
-        return _coerce_decimal(entry.get("in")), _coerce_decimal(entry.get("out"))
-    return _coerce_decimal(fallback_in_rate), _coerce_decimal(fallback_out_rate)
+        return _coerce_float(entry.get("in")), _coerce_float(entry.get("out"))
+    return _coerce_float(fallback_in_rate), _coerce_float(fallback_out_rate)
 
 
-def _coerce_decimal(value: Decimal | Number | str | None) -> Decimal | None:
+def _coerce_float(value: Number | str | None) -> float | None:
     if value in (None, ""):
         return None
-    if isinstance(value, Decimal):
-        return value
     try:
-        return Decimal(str(value))
-    except Exception as exc:  # pragma: no cover
-        raise MetricsParseError(f"Unable to coerce value '{value}' to Decimal") from exc
+        return float(value)
+    except (TypeError, ValueError) as exc:  # pragma: no cover
+        raise MetricsParseError(f"Unable to coerce value '{value}' to float") from exc
 
 
 def _estimate_cost(
     in_tokens: int,
     out_tokens: int,
-    rates: tuple[Decimal | None, Decimal | None],
-) -> Decimal | None:
+    rates: tuple[float | None, float | None],
+) -> float | None:
     in_rate, out_rate = rates
     if in_rate is None or out_rate is None:
         return None
-    million = Decimal("1000000")
-    cost_in = (Decimal(in_tokens) / million) * in_rate
-    cost_out = (Decimal(out_tokens) / million) * out_rate
-    return cost_in + cost_out
+    return (in_tokens * in_rate + out_tokens * out_rate) / 1_000_000
 
 
 def _parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
@@ -214,6 +314,8 @@ def main(argv: Sequence[str] | None = None) -> int:
         fallback_out_rate=args.fallback_out_rate,
     )
     for key, value in metrics.items():
+        if isinstance(value, float):
+            value = f"{value:.6f}"
         print(f"{key}={value}")
     return 0
 
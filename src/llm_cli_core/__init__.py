@@ -3,12 +3,16 @@
 from .telemetry.core import (
     AITelemetryTracker,
     track_ai_call,
+    flush_metrics,
     send_agent_metrics,  # Legacy compatibility
     TokenData,
     SessionInfo,
     OpenRouterTokens,
     AnthropicTokens,
     OpenAITokens,
+    openrouter_tokens,
+    anthropic_tokens,
+    openai_tokens,
 )
 
 __version__ = "0.1.0"
@@ -16,10 +20,14 @@ __version__ = "0.1.0"
 __all__ = [
     "AITelemetryTracker",
     "track_ai_call",
+    "flush_metrics",
     "send_agent_metrics",
     "TokenData",
     "SessionInfo",
     "OpenRouterTokens",
     "AnthropicTokens",
     "OpenAITokens",
+    "openrouter_tokens",
+    "anthropic_tokens",
+    "openai_tokens",
 ]
\ No newline at end of file
@@ -2,20 +2,28 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta, timezone
+from collections.abc import Iterator
+from dataclasses import dataclass, fields
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, cast
 
 from llm_cli_core.storage.readers import iter_telemetry_records
 
 
 @dataclass
 class CostFilters:
-    project: Optional[str] = None
-    agent: Optional[str] = None
-    model: Optional[str] = None
-    status: Optional[str] = None
+    project: str | None = None
+    agent: str | None = None
+    model: str | None = None
+    status: str | None = None
+
+
+# Filter values lower-cased once per report: (project, agent, model, status).
+_LoweredFilters = tuple[str | None, str | None, str | None, str | None]
+
+
+_FILTER_FIELDS = tuple(field.name for field in fields(CostFilters))
 
 
 def build_cost_report(
@@ -23,25 +31,35 @@ def build_cost_report(
     *,
     days: int,
     pricing,
-    filters: Optional[CostFilters] = None,
-    now: Optional[datetime] = None,
-) -> Dict[str, object]:
+    filters: CostFilters | None = None,
+    now: datetime | None = None,
+) -> dict[str, object]:
     """Aggregate cost metrics for telemetry records."""
 
     filters = filters or CostFilters()
-    now = now or datetime.now(timezone.utc)
+    now = now or datetime.now(UTC)
     start = now - timedelta(days=days)
 
-    total_cost = 0.0
-    total_calls = 0
-    total_input_tokens = 0
-    total_output_tokens = 0
-
-    by_model: Dict[str, Dict[str, object]] = {}
-    by_agent: Dict[str, Dict[str, object]] = {}
+    # Records are reduced once into per-(model, agent) rows; the model and
+    # agent sections and the grand totals are folded from those few rows at
+    # the end instead of being updated three times per record.
+    pairs: dict[tuple[str, str], list] = {}
+
+    # Loop-invariant lookups are bound once; the per-record work is dict access,
+    # so keeping attribute and global lookups out of the loop is what pays off.
+    estimate_cost = pricing.estimate_cost
+    matches_filters = _matches_filters
+    lowered = _lower_filters(filters)
+    filtering = any(lowered)
+    get_pair = pairs.get
+
+    # Records are decoded JSON objects; treat their values as Any.
+    records = cast(
+        Iterator[dict[str, Any]], iter_telemetry_records(base_dir, start, now)
+    )
 
-    for record in iter_telemetry_records(base_dir, start, now):
-        if not _matches_filters(record, filters):
+    for record in records:
+        if filtering and not matches_filters(record, lowered):
             continue
 
         tokens = record.get("tokens") or {}
@@ -52,7 +70,7 @@ def build_cost_report(
         cost = record.get("cost_usd")
         if cost in (None, 0, 0.0):
             model_name = str(record.get("model", "")).strip()
-            cost_estimate = pricing.estimate_cost(
+            cost_estimate = estimate_cost(
                 model_name,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
@@ -61,16 +79,35 @@ def build_cost_report(
         else:
             cost = float(cost)
 
-        total_calls += 1
-        total_cost += cost
-        total_input_tokens += input_tokens
-        total_output_tokens += output_tokens
+        key = (
+            str(record.get("model", "unknown")) or "unknown",
+            str(record.get("agent_name", "unknown")) or "unknown",
+        )
+        row = get_pair(key)
+        if row is None:
+            pairs[key] = [cost, 1, total_tokens, input_tokens, output_tokens]
+        else:
+            row[0] += cost
+            row[1] += 1
+            row[2] += total_tokens
+            row[3] += input_tokens
+            row[4] += output_tokens
+
+    total_cost = 0.0
+    total_calls = 0
+    total_input_tokens = 0
+    total_output_tokens = 0
 
-        model_key = str(record.get("model", "unknown")) or "unknown"
-        agent_key = str(record.get("agent_name", "unknown")) or "unknown"
+    by_model = _SectionStats()
+    by_agent = _SectionStats()
 
-        _accumulate(by_model, model_key, cost, total_tokens, input_tokens, output_tokens)
-        _accumulate(by_agent, agent_key, cost, total_tokens, input_tokens, output_tokens)
+    for (model_key, agent_key), row in pairs.items():
+        total_cost += row[0]
+        total_calls += row[1]
+        total_input_tokens += row[3]
+        total_output_tokens += row[4]
+        _accumulate(by_model, model_key, *row)
+        _accumulate(by_agent, agent_key, *row)
 
     return {
         "total_cost": round(total_cost, 6),
@@ -83,7 +120,11 @@ def build_cost_report(
         "currency": "USD",
         "by_model": _finalize_sections(by_model),
         "by_agent": _finalize_sections(by_agent),
-        "filters": {k: v for k, v in asdict(filters).items() if v is not None},
+        "filters": {
+            name: value
+            for name in _FILTER_FIELDS
+            if (value := getattr(filters, name)) is not None
+        },
         "window": {
             "start": start.isoformat(),
             "end": now.isoformat(),
@@ -92,25 +133,34 @@ def build_cost_report(
     }
 
 
-def _matches_filters(record: Dict[str, object], filters: CostFilters) -> bool:
-    if filters.project:
-        metadata = record.get("metadata") or {}
+def _lower_filters(filters: CostFilters) -> _LoweredFilters:
+    return (
+        filters.project.lower() if filters.project else None,
+        filters.agent.lower() if filters.agent else None,
+        filters.model.lower() if filters.model else None,
+        str(filters.status).lower() if filters.status else None,
+    )
+
+
+def _matches_filters(record: dict[str, object], lowered: _LoweredFilters) -> bool:
+    project_lc, agent_lc, model_lc, status = lowered
+    if project_lc:
+        metadata = record.get("metadata")
         project = metadata.get("project") if isinstance(metadata, dict) else None
-        if not project or project.lower() != filters.project.lower():
+        if not project or project.lower() != project_lc:
             return False
 
-    if filters.agent:
+    if agent_lc:
         agent = record.get("agent_name")
-        if not agent or str(agent).lower() != filters.agent.lower():
+        if not agent or str(agent).lower() != agent_lc:
             return False
 
-    if filters.model:
+    if model_lc:
         model = record.get("model")
-        if not model or str(model).lower() != filters.model.lower():
+        if not model or str(model).lower() != model_lc:
             return False
 
-    if filters.status:
-        status = str(filters.status).lower()
+    if status:
         success = bool(record.get("success", True))
         if status == "success" and not success:
             return False
@@ -120,30 +170,56 @@ def _matches_filters(record: Dict[str, object], filters: CostFilters) -> bool:
     return True
 
 
+class _SectionStats:
+    """Per-key aggregates kept column-wise, addressed by the key's interned index."""
+
+    __slots__ = ("calls", "cost", "index", "input", "output", "total")
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.cost: list[float] = []
+        self.calls: list[int] = []
+        self.total: list[int] = []
+        self.input: list[int] = []
+        self.output: list[int] = []
+
+
 def _accumulate(
-    section: Dict[str, Dict[str, object]],
+    section: _SectionStats,
     key: str,
     cost: float,
+    calls: int,
     total_tokens: int,
     input_tokens: int,
     output_tokens: int,
 ) -> None:
-    entry = section.setdefault(
-        key,
-        {
-            "cost_usd": 0.0,
-            "calls": 0,
-            "tokens": {"total": 0, "input": 0, "output": 0},
-        },
-    )
-    entry["cost_usd"] = round(entry["cost_usd"] + cost, 6)
-    entry["calls"] += 1
-    tokens = entry["tokens"]
-    tokens["total"] += total_tokens
-    tokens["input"] += input_tokens
-    tokens["output"] += output_tokens
-
-
-def _finalize_sections(section: Dict[str, Dict[str, object]]) -> Dict[str, Dict[str, object]]:
-    return dict(sorted(section.items(), key=lambda item: item[1]["cost_usd"], reverse=True))
-
+    idx = section.index.get(key)
+    if idx is None:
+        idx = section.index[key] = len(section.cost)
+        section.cost.append(cost)
+        section.calls.append(calls)
+        section.total.append(total_tokens)
+        section.input.append(input_tokens)
+        section.output.append(output_tokens)
+        return
+    section.cost[idx] += cost
+    section.calls[idx] += calls
+    section.total[idx] += total_tokens
+    section.input[idx] += input_tokens
+    section.output[idx] += output_tokens
+
+
+def _finalize_sections(section: _SectionStats) -> dict[str, dict[str, object]]:
+    ordered = sorted(section.index.items(), key=lambda item: section.cost[item[1]], reverse=True)
+    return {
+        key: {
+            "cost_usd": round(section.cost[idx], 6),
+            "calls": section.calls[idx],
+            "tokens": {
+                "total": section.total[idx],
+                "input": section.input[idx],
+                "output": section.output[idx],
+            },
+        }
+        for key, idx in ordered
+    }
@@ -3,9 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
 from rich.console import Console
 from rich.table import Table
 
@@ -79,7 +85,17 @@ def _handle_costs(args: argparse.Namespace) -> int:
     )
 
     if args.as_json:
-        console.print_json(data=report)
+        if orjson is not None:
+            # Emit orjson's bytes as-is; print_json would re-parse and highlight them.
+            sys.stdout.flush()
+            sys.stdout.buffer.write(
+                orjson.dumps(
+                    report, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+                )
+            )
+            sys.stdout.buffer.flush()
+        else:
+            console.print_json(data=report)
         return 0
 
     return _render_cost_report(report)
@@ -107,7 +123,7 @@ def _render_cost_report(report: Dict[str, Any]) -> int:
         console.print(f"Filters: {rendered_filters}")
 
     console.print(f"Total calls: {total_calls}")
-    console.print(f"Total cost: {format_currency(total_cost)}")
+    console.print(f"Total cost: {_format_usd(total_cost)}")
     console.print(
         "Tokens: input {input:,} | output {output:,} | total {total:,}".format(
             input=tokens.get("input", 0),
@@ -143,7 +159,7 @@ def _build_cost_table(section: Dict[str, Dict[str, Any]]) -> Table:
         table.add_row(
             name,
             f"{stats.get('calls', 0):,}",
-            format_currency(stats.get("cost_usd", 0.0)),
+            _format_usd(stats.get("cost_usd", 0.0)),
             f"{tokens.get('total', 0):,}",
         )
     return table
@@ -154,7 +170,12 @@ def format_currency(value: Any) -> str:
         amount = float(value)
     except (TypeError, ValueError):
         return "$0.00"
-    return f"${amount:,.4f}"
+    return _format_usd(amount)
+
+
+def _format_usd(value: float) -> str:
+    # Report values are always floats, so table rendering skips format_currency's coercion.
+    return f"${value:,.4f}"
 
 
 if __name__ == "__main__":
@@ -6,12 +6,11 @@ import os
 from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
 
 from dotenv import load_dotenv
 
 
-def _to_bool(value: Optional[str], default: bool) -> bool:
+def _to_bool(value: str | None, default: bool) -> bool:
     if value is None:
         return default
     lowered = value.strip().lower()
@@ -22,22 +21,37 @@ def _to_bool(value: Optional[str], default: bool) -> bool:
     return default
 
 
+def _to_int(value: str | None, default: int) -> int:
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
 @dataclass(frozen=True)
 class Config:
     """Runtime configuration values."""
 
     telemetry_enabled: bool = True
     storage_enabled: bool = True
+    telemetry_sync: bool = False
+    track_empty_calls: bool = True
     telemetry_dir: Path = field(default_factory=lambda: Path(".llm-telemetry"))
     pushgateway_url: str = "http://localhost:7101"
     store_prompts: bool = False
     store_responses: bool = False
+    hash_algorithm: str = "blake2b"
     project_name: str = field(default_factory=lambda: Path.cwd().name)
     cache_dir: Path = field(
         default_factory=lambda: Path.home() / ".cache" / "llm-cli-tools-core"
     )
+    flush_threshold_records: int = 64
+    flush_threshold_bytes: int = 64_000
+    compact_after_days: int = 0
 
-    def resolve_telemetry_dir(self, cwd: Optional[Path] = None) -> Path:
+    def resolve_telemetry_dir(self, cwd: Path | None = None) -> Path:
         base = cwd or Path.cwd()
         path = self.telemetry_dir
         return (path if path.is_absolute() else base / path).expanduser().resolve()
@@ -54,8 +68,13 @@ def get_config() -> Config:
 
     telemetry_enabled = _to_bool(os.getenv("LLM_TELEMETRY_ENABLED"), True)
     storage_enabled = _to_bool(os.getenv("LLM_TELEMETRY_STORAGE_ENABLED"), True)
+    telemetry_sync = _to_bool(os.getenv("LLM_TELEMETRY_SYNC"), False)
+    track_empty_calls = _to_bool(os.getenv("LLM_TELEMETRY_TRACK_EMPTY"), True)
     store_prompts = _to_bool(os.getenv("LLM_STORE_PROMPTS"), False)
     store_responses = _to_bool(os.getenv("LLM_STORE_RESPONSES"), False)
+    hash_algorithm = os.getenv("LLM_TELEMETRY_HASH", "blake2b").strip().lower()
+    if hash_algorithm not in {"blake2b", "sha256"}:
+        hash_algorithm = "blake2b"
     telemetry_dir = Path(
         os.getenv("LLM_TELEMETRY_DIR", ".llm-telemetry")
     ).expanduser()
@@ -64,16 +83,25 @@ def get_config() -> Config:
     cache_dir = Path(
         os.getenv("LLM_CACHE_DIR", Path.home() / ".cache" / "llm-cli-tools-core")
     )
+    flush_threshold_records = _to_int(os.getenv("LLM_TELEMETRY_FLUSH_RECORDS"), 64)
+    flush_threshold_bytes = _to_int(os.getenv("LLM_TELEMETRY_FLUSH_BYTES"), 64_000)
+    compact_after_days = _to_int(os.getenv("LLM_TELEMETRY_COMPACT_AFTER_DAYS"), 0)
 
     return Config(
         telemetry_enabled=telemetry_enabled,
         storage_enabled=storage_enabled,
+        telemetry_sync=telemetry_sync,
+        track_empty_calls=track_empty_calls,
         telemetry_dir=telemetry_dir,
         pushgateway_url=pushgateway_url,
         store_prompts=store_prompts,
         store_responses=store_responses,
+        hash_algorithm=hash_algorithm,
         project_name=project_name,
         cache_dir=cache_dir,
+        flush_threshold_records=flush_threshold_records,
+        flush_threshold_bytes=flush_threshold_bytes,
+        compact_after_days=compact_after_days,
     )
 
 
@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
+import importlib.util
 import json
 import logging
-from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import UTC, datetime, timedelta
+from typing import Any, ClassVar
 
 import httpx
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
 from llm_cli_core.config import Config, get_config
 
 logger = logging.getLogger(__name__)
@@ -20,16 +31,18 @@ LITELLM_PRICING_URL = (
 OPENROUTER_PRICING_URL = "https://openrouter.ai/api/v1/models"
 CACHE_FILENAME = "pricing.json"
 REFRESH_INTERVAL = timedelta(days=7)
+# httpx only negotiates HTTP/2 when the optional h2 package is installed.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
 @dataclass
 class ModelPricing:
-    prompt: Optional[float]
-    completion: Optional[float]
-    request: Optional[float] = None
+    prompt: float | None
+    completion: float | None
+    request: float | None = None
     source: str = "litellm"
 
-    def estimate(self, *, input_tokens: int, output_tokens: int) -> Optional[float]:
+    def estimate(self, *, input_tokens: int, output_tokens: int) -> float | None:
         total = 0.0
         have_cost = False
         if self.prompt is not None:
@@ -44,59 +57,89 @@ class ModelPricing:
         return total if have_cost else None
 
 
+_PRICING_FIELDS = tuple(field.name for field in fields(ModelPricing))
+
+
 class PricingCache:
     """Maintains locally cached pricing metadata."""
 
-    def __init__(self, config: Optional[Config] = None) -> None:
+    # One connection pool shared by every refresh in the process.
+    _client: ClassVar[httpx.Client | None] = None
+    _client_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, config: Config | None = None) -> None:
         self.config = config or get_config()
         self.cache_path = self.config.resolve_cache_dir() / CACHE_FILENAME
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        self._models: Dict[str, ModelPricing] = {}
-        self._fetched_at: Optional[datetime] = None
-
-    def load(self, force: bool = False) -> Dict[str, ModelPricing]:
+        self._models: dict[str, ModelPricing] = {}
+        self._fetched_at: datetime | None = None
+        # Monotonic deadline until which ``_models`` is known to be fresh, letting
+        # estimate_cost skip the staleness check in load() on every record.
+        self._fresh_until = 0.0
+        # Normalised token -> (insertion position, pricing); rebuilt whenever
+        # ``_models`` is replaced so fuzzy lookups avoid rescanning every model.
+        self._token_index: dict[str, tuple[int, ModelPricing]] = {}
+        self._token_index_source: dict[str, ModelPricing] | None = None
+        # Telemetry uses few distinct model names, so resolutions are memoised
+        # per model string and dropped whenever ``_models`` is replaced.
+        self._resolve_cached = functools.lru_cache(maxsize=1024)(self._resolve)
+        self._resolved_source: dict[str, ModelPricing] | None = None
+
+    def load(self, force: bool = False) -> dict[str, ModelPricing]:
         if not force and self._models and not self._is_stale(self._fetched_at):
             return self._models
 
         if not force and self.cache_path.exists():
             try:
-                cached = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                cached = _loads(self.cache_path.read_bytes())
                 fetched_at = _parse_dt(cached.get("fetched_at"))
-                if not self._is_stale(fetched_at):
+                if fetched_at is not None and not self._is_stale(fetched_at):
                     models = {
                         key: ModelPricing(**value)
                         for key, value in cached.get("models", {}).items()
                     }
-                    self._models = models
-                    self._fetched_at = fetched_at
+                    self._set_models(models, fetched_at)
                     return self._models
             except Exception as exc:
                 logger.debug(f"Failed to load pricing cache: {exc}")
 
         models, fetched_at = self._fetch_remote()
-        self._models = models
-        self._fetched_at = fetched_at
+        self._set_models(models, fetched_at)
         self._persist_cache()
         return self._models
 
+    def _set_models(self, models: dict[str, ModelPricing], fetched_at: datetime) -> None:
+        self._models = models
+        self._fetched_at = fetched_at
+        remaining = REFRESH_INTERVAL - (datetime.now(UTC) - fetched_at)
+        self._fresh_until = time.monotonic() + remaining.total_seconds()
+
     def estimate_cost(
         self, model: str, *, input_tokens: int, output_tokens: int
-    ) -> Optional[float]:
+    ) -> float | None:
         if not model:
             return None
         model = model.strip()
         if not model:
             return None
 
-        models = self.load()
-        lookup = self._lookup_model(models, model)
+        models = self._models
+        if not models or time.monotonic() >= self._fresh_until:
+            models = self.load()
+        if self._resolved_source is not models:
+            self._resolve_cached.cache_clear()
+            self._resolved_source = models
+        lookup = self._resolve_cached(model)
         if not lookup:
             return None
         return lookup.estimate(input_tokens=input_tokens, output_tokens=output_tokens)
 
+    def _resolve(self, model: str) -> ModelPricing | None:
+        return self._lookup_model(self._models, model)
+
     def _lookup_model(
-        self, models: Dict[str, ModelPricing], model: str
-    ) -> Optional[ModelPricing]:
+        self, models: dict[str, ModelPricing], model: str
+    ) -> ModelPricing | None:
         key = model.lower()
         query_tokens = _normalise_key(key)
 
@@ -104,101 +147,149 @@ class PricingCache:
             if token in models:
                 return models[token]
 
-        for candidate_key, pricing in models.items():
-            candidate_tokens = _normalise_key(candidate_key)
-            if query_tokens & candidate_tokens:
-                return pricing
-        return None
+        # Earliest model sharing any token wins, as with a linear scan of ``models``.
+        index = self._get_token_index(models)
+        best: tuple[int, ModelPricing] | None = None
+        for token in query_tokens:
+            hit = index.get(token)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+        return best[1] if best else None
+
+    def _get_token_index(
+        self, models: dict[str, ModelPricing]
+    ) -> dict[str, tuple[int, ModelPricing]]:
+        if self._token_index_source is not models:
+            index: dict[str, tuple[int, ModelPricing]] = {}
+            for position, (candidate_key, pricing) in enumerate(models.items()):
+                for token in _normalise_key(candidate_key):
+                    index.setdefault(token, (position, pricing))
+            self._token_index = index
+            self._token_index_source = models
+        return self._token_index
 
     def _persist_cache(self) -> None:
         if not self._models or not self._fetched_at:
             return
         payload = {
             "fetched_at": self._fetched_at.isoformat(),
-            "models": {key: asdict(value) for key, value in self._models.items()},
+            "models": {
+                key: {name: getattr(value, name) for name in _PRICING_FIELDS}
+                for key, value in self._models.items()
+            },
         }
-        self.cache_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        self.cache_path.write_bytes(_dumps(payload))
 
-    def _is_stale(self, fetched_at: Optional[datetime]) -> bool:
+    def _is_stale(self, fetched_at: datetime | None) -> bool:
         if fetched_at is None:
             return True
-        return datetime.now(timezone.utc) - fetched_at > REFRESH_INTERVAL
+        return datetime.now(UTC) - fetched_at > REFRESH_INTERVAL
+
+    @classmethod
+    def _get_client(cls) -> httpx.Client:
+        with cls._client_lock:
+            if cls._client is None or cls._client.is_closed:
+                cls._client = httpx.Client(timeout=10.0, http2=_HTTP2_AVAILABLE)
+            return cls._client
+
+    @classmethod
+    def _close_client(cls) -> None:
+        with cls._client_lock:
+            if cls._client is not None:
+                cls._client.close()
+                cls._client = None
+
+    def _fetch_remote(self) -> tuple[dict[str, ModelPricing], datetime]:
+        models: dict[str, ModelPricing] = {}
+        fetched_at = datetime.now(UTC)
+
+        # Both sources are independent, so fetch them concurrently on the shared client.
+        client = self._get_client()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            litellm_future = executor.submit(client.get, LITELLM_PRICING_URL)
+            openrouter_future = executor.submit(client.get, OPENROUTER_PRICING_URL)
+
+        try:
+            _add_litellm_models(models, _response_json(litellm_future.result()))
+        except Exception as exc:  # noqa: BLE001 - one failed source must not lose the other
+            logger.warning(f"Failed to refresh litellm pricing map: {exc}")
+
+        try:
+            _add_openrouter_models(models, _response_json(openrouter_future.result()))
+        except Exception as exc:  # noqa: BLE001 - one failed source must not lose the other
+            logger.warning(f"Failed to refresh OpenRouter pricing data: {exc}")
 
-    def _fetch_remote(self) -> Tuple[Dict[str, ModelPricing], datetime]:
-        models: Dict[str, ModelPricing] = {}
-        fetched_at = datetime.now(timezone.utc)
+        return models, fetched_at
 
-        with httpx.Client(timeout=10.0) as client:
-            try:
-                response = client.get(LITELLM_PRICING_URL)
-                response.raise_for_status()
-                data = response.json()
-                for key, info in data.items():
-                    prompt = info.get("input_cost_per_token")
-                    completion = info.get("output_cost_per_token")
-                    request_cost = info.get("request_cost")
-                    if prompt is None and completion is None and request_cost is None:
-                        continue
-                    models[key.lower()] = ModelPricing(
-                        prompt=float(prompt) if prompt is not None else None,
-                        completion=float(completion) if completion is not None else None,
-                        request=float(request_cost) if request_cost is not None else None,
-                        source="litellm",
-                    )
-            except Exception as exc:
-                logger.warning(f"Failed to refresh litellm pricing map: {exc}")
 
-            try:
-                response = client.get(OPENROUTER_PRICING_URL)
-                response.raise_for_status()
-                data = response.json().get("data", [])
-                for item in data:
-                    pricing = item.get("pricing") or {}
-                    prompt = pricing.get("prompt")
-                    completion = pricing.get("completion")
-                    request_cost = pricing.get("request")
-
-                    def _to_float(value: Optional[str]) -> Optional[float]:
-                        if value in (None, "", "0"):
-                            return None
-                        try:
-                            return float(value)
-                        except ValueError:
-                            return None
-
-                    prompt_cost = _to_float(prompt)
-                    completion_cost = _to_float(completion)
-                    request_float = _to_float(request_cost)
-
-                    if prompt_cost is None and completion_cost is None and request_float is None:
-                        continue
-
-                    models[item["id"].lower()] = ModelPricing(
-                        prompt=prompt_cost,
-                        completion=completion_cost,
-                        request=request_float,
-                        source="openrouter",
-                    )
-            except Exception as exc:
-                logger.warning(f"Failed to refresh OpenRouter pricing data: {exc}")
+atexit.register(PricingCache._close_client)
 
-        return models, fetched_at
 
+def _response_json(response: httpx.Response) -> Any:
+    response.raise_for_status()
+    return response.json()
 
-_pricing_cache: Optional[PricingCache] = None
 
+def _add_litellm_models(models: dict[str, ModelPricing], data: dict[str, Any]) -> None:
+    for key, info in data.items():
+        prompt = info.get("input_cost_per_token")
+        completion = info.get("output_cost_per_token")
+        request_cost = info.get("request_cost")
+        if prompt is None and completion is None and request_cost is None:
+            continue
+        models[key.lower()] = ModelPricing(
+            prompt=float(prompt) if prompt is not None else None,
+            completion=float(completion) if completion is not None else None,
+            request=float(request_cost) if request_cost is not None else None,
+            source="litellm",
+        )
 
+
+def _add_openrouter_models(models: dict[str, ModelPricing], payload: dict[str, Any]) -> None:
+    for item in payload.get("data", []):
+        pricing = item.get("pricing") or {}
+        prompt_cost = _to_float(pricing.get("prompt"))
+        completion_cost = _to_float(pricing.get("completion"))
+        request_float = _to_float(pricing.get("request"))
+
+        if prompt_cost is None and completion_cost is None and request_float is None:
+            continue
+
+        models[item["id"].lower()] = ModelPricing(
+            prompt=prompt_cost,
+            completion=completion_cost,
+            request=request_float,
+            source="openrouter",
+        )
+
+
+def _to_float(value: str | None) -> float | None:
+    if value in (None, "", "0"):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
 def get_pricing_cache() -> PricingCache:
-    global _pricing_cache
-    if _pricing_cache is None:
-        _pricing_cache = PricingCache()
-    return _pricing_cache
+    """Return the process-wide pricing cache."""
+
+    return PricingCache()
+
+
+def reset_pricing_cache() -> None:
+    """Drop the shared pricing cache (useful for tests)."""
+
+    get_pricing_cache.cache_clear()
 
 
-def _normalise_key(value: str) -> set[str]:
+@functools.lru_cache(maxsize=4096)
+def _normalise_key(value: str) -> frozenset[str]:
     value = value.lower().strip()
     if not value:
-        return set()
+        return frozenset()
 
     tokens = {value}
     for sep in (":", "/", "."):
@@ -219,14 +310,25 @@ def _normalise_key(value: str) -> set[str]:
             if candidate:
                 tokens.add(candidate)
 
-    return {token for token in tokens if token}
+    return frozenset(token for token in tokens if token)
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(payload: object) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
 
 
-def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+def _parse_dt(value: str | None) -> datetime | None:
     if not value:
         return None
-    if value.endswith("Z"):
-        value = value.replace("Z", "+00:00")
+    # fromisoformat accepts a trailing "Z" natively on Python 3.11+ (our minimum).
     try:
         return datetime.fromisoformat(value)
     except ValueError:
@@ -237,4 +339,5 @@ __all__ = [
     "ModelPricing",
     "PricingCache",
     "get_pricing_cache",
+    "reset_pricing_cache",
 ]
@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class TelemetryRecord:
     """Structured telemetry payload ready for persistence."""
 
@@ -24,11 +25,11 @@ class TelemetryRecord:
     output_tokens: int
     cost_usd: float
     success: bool
-    prompt_hash: Optional[str]
-    response_hash: Optional[str]
-    metadata: Dict[str, Any]
-    prompt_text: Optional[str] = None
-    response_text: Optional[str] = None
+    prompt_hash: str | None
+    response_hash: str | None
+    metadata: dict[str, Any]
+    prompt_text: str | None = None
+    response_text: str | None = None
 
 
 class StorageBackend(ABC):
@@ -38,3 +39,9 @@ class StorageBackend(ABC):
     def record(self, record: TelemetryRecord) -> None:
         """Persist a telemetry record."""
 
+    def record_batch(self, records: Iterable[TelemetryRecord]) -> None:
+        """Persist several telemetry records; backends may override to batch I/O."""
+
+        for record in records:
+            self.record(record)
+
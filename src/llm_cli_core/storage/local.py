@@ -3,16 +3,55 @@
 from __future__ import annotations
 
 import json
-from datetime import timezone
+import os
+import shutil
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, date, timedelta
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, BinaryIO
 
-from filelock import FileLock
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; use sidecar lock files
+    fcntl = None  # type: ignore[assignment]
+    from filelock import FileLock
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compression
+    zstandard = None  # type: ignore[assignment]
 
 from llm_cli_core.config import Config
 
 from .base import StorageBackend, TelemetryRecord
 
+SUMMARY_FILENAME = "summary.json"
+# summary.json is maintained incrementally: records are tallied in memory and
+# the tallies (and buffered lines) are written on flush, after this many
+# records, or once this many seconds have passed since the last write.
+SUMMARY_MATERIALIZE_EVERY = 100
+SUMMARY_MATERIALIZE_INTERVAL = 5.0
+# Appends up to this size are written to a cached O_APPEND descriptor without
+# taking a lock: the kernel keeps each such write contiguous at end of file.
+ATOMIC_APPEND_LIMIT = 4000
+TELEMETRY_FILENAME = "telemetry.jsonl"
+# When Config.compact_after_days is set, day files older than that are rolled
+# into concatenated zstd frames of COMPRESS_FRAME_SIZE uncompressed bytes each
+# by the first write of each new day.
+COMPRESSED_TELEMETRY_FILENAME = TELEMETRY_FILENAME + ".zst"
+COMPRESS_FRAME_SIZE = 1 << 20
+COMPRESS_LEVEL = 3
+
 
 class LocalStorage(StorageBackend):
     """Persist telemetry to JSONL files on the local filesystem."""
@@ -21,109 +60,188 @@ class LocalStorage(StorageBackend):
         self.config = config
         self.base_dir = config.resolve_telemetry_dir()
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.summary_path = self.base_dir / SUMMARY_FILENAME
+        self._summary = SummaryAccumulator()
+        self._materialize_due = time.monotonic() + SUMMARY_MATERIALIZE_INTERVAL
+        self._buffer = _WriteBuffer()
+        # Paths for the most recent UTC day; records arrive in time order, so this
+        # avoids rebuilding paths and re-running mkdir for every record.
+        self._day_cache: tuple[date, Path, Path, Path] | None = None
+        # Flush buffered lines, merge pending summary tallies and close cached
+        # descriptors when the storage is collected or the interpreter exits.
+        self._finalizer = weakref.finalize(
+            self, _close_storage, self._buffer, self._summary, self.summary_path
+        )
 
     def record(self, record: TelemetryRecord) -> None:
-        timestamp = record.timestamp.astimezone(timezone.utc)
-        date_dir = self.base_dir / timestamp.strftime("%Y-%m-%d")
-        date_dir.mkdir(parents=True, exist_ok=True)
-
-        telemetry_path = date_dir / "telemetry.jsonl"
-        prompts_path = date_dir / "prompts.jsonl"
-        responses_path = date_dir / "responses.jsonl"
-        summary_path = self.base_dir / "summary.json"
+        timestamp = record.timestamp.astimezone(UTC)
+        telemetry_path, prompts_path, responses_path = self._day_paths(timestamp.date())
 
         payload = self._build_payload(record, timestamp.isoformat())
         self._append_jsonl(telemetry_path, payload)
-        self._update_summary(summary_path, payload)
+        if (
+            self._summary.add(record) >= SUMMARY_MATERIALIZE_EVERY
+            or time.monotonic() >= self._materialize_due
+        ):
+            self.materialize_summary()
 
         if self.config.store_prompts and record.prompt_text:
-            self._append_jsonl(
-                prompts_path,
-                {
-                    "timestamp": payload["timestamp"],
-                    "agent_name": record.agent_name,
-                    "operation": record.operation,
-                    "prompt_hash": record.prompt_hash,
-                    "prompt": record.prompt_text,
-                },
-            )
+            self._append_jsonl(prompts_path, _prompt_payload(record, payload["timestamp"]))
 
         if self.config.store_responses and record.response_text:
             self._append_jsonl(
-                responses_path,
-                {
-                    "timestamp": payload["timestamp"],
-                    "agent_name": record.agent_name,
-                    "operation": record.operation,
-                    "response_hash": record.response_hash,
-                    "response": record.response_text,
-                },
+                responses_path, _response_payload(record, payload["timestamp"])
             )
 
-    def _append_jsonl(self, path: Path, payload: Dict[str, Any]) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        lock = FileLock(str(path) + ".lock")
-        with lock:
-            with path.open("a", encoding="utf-8") as handle:
-                json.dump(payload, handle, ensure_ascii=False)
-                handle.write("\n")
-
-    def _update_summary(self, path: Path, payload: Dict[str, Any]) -> None:
-        lock = FileLock(str(path) + ".lock")
-        with lock:
-            if path.exists():
-                summary = json.loads(path.read_text(encoding="utf-8"))
-            else:
-                summary = {
-                    "total_cost": 0.0,
-                    "total_calls": 0,
-                    "total_tokens": {
-                        "input": 0,
-                        "output": 0,
-                        "total": 0,
-                    },
-                    "by_model": {},
-                    "by_agent": {},
-                    "by_status": {"success": 0, "failure": 0},
-                }
-
-            cost = payload.get("cost_usd", 0.0) or 0.0
-            tokens = payload.get("tokens", {})
-            input_tokens = tokens.get("input", 0) or 0
-            output_tokens = tokens.get("output", 0) or 0
-            total_tokens = tokens.get("total", input_tokens + output_tokens) or 0
-            success = bool(payload.get("success", True))
-            agent = payload.get("agent_name", "unknown")
-            model = payload.get("model", "unknown")
-
-            summary["total_calls"] += 1
-            summary["total_cost"] = round(summary["total_cost"] + cost, 10)
-            summary["total_tokens"]["input"] += input_tokens
-            summary["total_tokens"]["output"] += output_tokens
-            summary["total_tokens"]["total"] += total_tokens
-
-            summary["by_model"].setdefault(model, {"calls": 0, "cost_usd": 0.0, "tokens": 0})
-            summary["by_model"][model]["calls"] += 1
-            summary["by_model"][model]["cost_usd"] = round(
-                summary["by_model"][model]["cost_usd"] + cost, 10
-            )
-            summary["by_model"][model]["tokens"] += total_tokens
+    def record_batch(self, records: Iterable[TelemetryRecord]) -> None:
+        """Persist many records with one locked append per file and one summary update."""
 
-            summary["by_agent"].setdefault(
-                agent, {"calls": 0, "cost_usd": 0.0, "tokens": 0}
-            )
-            summary["by_agent"][agent]["calls"] += 1
-            summary["by_agent"][agent]["cost_usd"] = round(
-                summary["by_agent"][agent]["cost_usd"] + cost, 10
-            )
-            summary["by_agent"][agent]["tokens"] += total_tokens
+        lines: dict[Path, list[bytes]] = {}
+        day_paths: dict[date, tuple[Path, Path, Path]] = {}
+        for record in records:
+            timestamp = record.timestamp.astimezone(UTC)
+            day = timestamp.date()
+            paths = day_paths.get(day)
+            if paths is None:
+                paths = day_paths[day] = self._make_day_paths(day)
+            telemetry_path, prompts_path, responses_path = paths
+
+            payload = self._build_payload(record, timestamp.isoformat())
+            lines.setdefault(telemetry_path, []).append(_dumps_line(payload))
+            self._summary.add(record)
+
+            if self.config.store_prompts and record.prompt_text:
+                lines.setdefault(prompts_path, []).append(
+                    _dumps_line(_prompt_payload(record, payload["timestamp"]))
+                )
+            if self.config.store_responses and record.response_text:
+                lines.setdefault(responses_path, []).append(
+                    _dumps_line(_response_payload(record, payload["timestamp"]))
+                )
+
+        if not lines:
+            return
+
+        # Earlier single-record lines must land ahead of the batch.
+        self._buffer.flush()
+        for path, path_lines in lines.items():
+            _locked_append(path, b"".join(path_lines))
+        self.materialize_summary()
+
+    def _day_paths(self, day: date) -> tuple[Path, Path, Path]:
+        cached = self._day_cache
+        if cached is not None and cached[0] == day:
+            return cached[1], cached[2], cached[3]
+
+        if cached is not None:
+            # New day: write out the previous day's lines and drop its descriptors.
+            self._buffer.close()
+        paths = self._make_day_paths(day)
+        self._day_cache = (day, *paths)
+        if self.config.compact_after_days > 0:
+            self._compact_before(day - timedelta(days=self.config.compact_after_days))
+        return paths
+
+    def _make_day_paths(self, day: date) -> tuple[Path, Path, Path]:
+        date_dir = self.base_dir / day.isoformat()
+        date_dir.mkdir(parents=True, exist_ok=True)
+        return (
+            date_dir / TELEMETRY_FILENAME,
+            date_dir / "prompts.jsonl",
+            date_dir / "responses.jsonl",
+        )
+
+    def compact_day(self, day: date) -> bool:
+        """Compress ``day``'s telemetry.jsonl into zstd frames.
 
-            key = "success" if success else "failure"
-            summary["by_status"][key] = summary["by_status"].get(key, 0) + 1
+        New lines are appended as further frames when the day already has a
+        compressed file. Returns False when zstandard is unavailable or there is
+        nothing to compact.
+        """
 
-            path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+        if zstandard is None:
+            return False
+        date_dir = self.base_dir / day.isoformat()
+        source = date_dir / TELEMETRY_FILENAME
+        if not source.exists():
+            return False
 
-    def _build_payload(self, record: TelemetryRecord, timestamp: str) -> Dict[str, Any]:
+        # Nothing for the day may still be buffered or held open.
+        self._buffer.close()
+        target = date_dir / COMPRESSED_TELEMETRY_FILENAME
+        temp = date_dir / f"{COMPRESSED_TELEMETRY_FILENAME}.{os.getpid()}.tmp"
+        compressor = zstandard.ZstdCompressor(level=COMPRESS_LEVEL)
+        with _locked_file(source) as handle:
+            # Another process may have compacted the day while we waited for
+            # the lock; our handle then points at the unlinked file.
+            try:
+                current = os.stat(source)
+            except FileNotFoundError:
+                return False
+            if os.fstat(handle.fileno()).st_ino != current.st_ino:
+                return False
+            with temp.open("wb") as out:
+                if target.exists():
+                    with target.open("rb") as existing:
+                        shutil.copyfileobj(existing, out)
+                while True:
+                    chunk = handle.read(COMPRESS_FRAME_SIZE)
+                    if not chunk:
+                        break
+                    out.write(compressor.compress(chunk))
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp, target)
+            try:
+                source.unlink()
+            except FileNotFoundError:
+                pass
+        return True
+
+    def _compact_before(self, cutoff: date) -> None:
+        if zstandard is None:
+            return
+        for date_dir in self.base_dir.iterdir():
+            try:
+                day = date.fromisoformat(date_dir.name)
+            except ValueError:
+                continue
+            if day < cutoff and (date_dir / TELEMETRY_FILENAME).exists():
+                try:
+                    self.compact_day(day)
+                except OSError:
+                    # Compaction is opportunistic; the plain file stays readable.
+                    continue
+
+    def flush(self) -> None:
+        """Write all buffered JSONL lines and pending summary tallies to disk."""
+
+        self.materialize_summary()
+
+    def close(self) -> None:
+        """Flush buffered lines and summary tallies, close descriptors and detach the exit hook."""
+
+        self._finalizer()
+
+    def _append_jsonl(self, path: Path, payload: dict[str, Any]) -> None:
+        records, size = self._buffer.add(path, _dumps_line(payload))
+        if (
+            records >= self.config.flush_threshold_records
+            or size >= self.config.flush_threshold_bytes
+        ):
+            self._buffer.flush()
+
+    def materialize_summary(self) -> dict[str, Any]:
+        """Merge summary tallies recorded since the last merge into ``summary.json``.
+
+        Returns the merged summary.
+        """
+
+        self._materialize_due = time.monotonic() + SUMMARY_MATERIALIZE_INTERVAL
+        self._buffer.flush()
+        return _merge_summary(self.summary_path, self._summary)
+
+    def _build_payload(self, record: TelemetryRecord, timestamp: str) -> dict[str, Any]:
         return {
             "timestamp": timestamp,
             "agent_name": record.agent_name,
@@ -144,3 +262,260 @@ class LocalStorage(StorageBackend):
             "metadata": record.metadata,
         }
 
+
+@dataclass(slots=True)
+class SummaryAccumulator:
+    """Summary tallies for records not yet merged into ``summary.json``.
+
+    ``by_model`` and ``by_agent`` map names to ``[calls, cost_usd, tokens]``.
+    """
+
+    calls: int = 0
+    cost: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    successes: int = 0
+    by_model: dict[str, list[Any]] = field(default_factory=dict)
+    by_agent: dict[str, list[Any]] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, record: TelemetryRecord) -> int:
+        """Tally one record and return the number of records pending."""
+
+        cost = record.cost_usd or 0.0
+        tokens = record.total_tokens or 0
+        with self._lock:
+            self.calls += 1
+            self.cost += cost
+            self.input_tokens += record.input_tokens or 0
+            self.output_tokens += record.output_tokens or 0
+            self.total_tokens += tokens
+            if record.success:
+                self.successes += 1
+            for section, key in ((self.by_model, record.model), (self.by_agent, record.agent_name)):
+                entry = section.get(key)
+                if entry is None:
+                    section[key] = [1, cost, tokens]
+                else:
+                    entry[0] += 1
+                    entry[1] += cost
+                    entry[2] += tokens
+            return self.calls
+
+    def drain(self) -> SummaryAccumulator | None:
+        """Return the pending tallies (None if there are none) and reset."""
+
+        with self._lock:
+            if not self.calls:
+                return None
+            pending = SummaryAccumulator(
+                calls=self.calls,
+                cost=self.cost,
+                input_tokens=self.input_tokens,
+                output_tokens=self.output_tokens,
+                total_tokens=self.total_tokens,
+                successes=self.successes,
+                by_model=self.by_model,
+                by_agent=self.by_agent,
+            )
+            self.calls = self.input_tokens = self.output_tokens = 0
+            self.total_tokens = self.successes = 0
+            self.cost = 0.0
+            self.by_model = {}
+            self.by_agent = {}
+            return pending
+
+    def merge_into(self, summary: dict[str, Any]) -> None:
+        summary["total_calls"] += self.calls
+        summary["total_cost"] = round(summary["total_cost"] + self.cost, 10)
+        totals = summary["total_tokens"]
+        totals["input"] += self.input_tokens
+        totals["output"] += self.output_tokens
+        totals["total"] += self.total_tokens
+
+        for section, tallies in (("by_model", self.by_model), ("by_agent", self.by_agent)):
+            entries = summary[section]
+            for key, (calls, cost, tokens) in tallies.items():
+                entry = entries.setdefault(key, {"calls": 0, "cost_usd": 0.0, "tokens": 0})
+                entry["calls"] += calls
+                entry["cost_usd"] = round(entry["cost_usd"] + cost, 10)
+                entry["tokens"] += tokens
+
+        by_status = summary["by_status"]
+        by_status["success"] = by_status.get("success", 0) + self.successes
+        by_status["failure"] = by_status.get("failure", 0) + self.calls - self.successes
+
+
+class _WriteBuffer:
+    """JSONL lines pending per file, written with one lock and one open per file."""
+
+    def __init__(self) -> None:
+        self._lines: dict[Path, list[bytes]] = {}
+        self._records = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        # Long-lived O_APPEND descriptors for small unlocked appends, and a lock
+        # serialising writes against descriptor teardown.
+        self._fds: dict[Path, int] = {}
+        self._io_lock = threading.Lock()
+
+    def add(self, path: Path, line: bytes) -> tuple[int, int]:
+        with self._lock:
+            self._lines.setdefault(path, []).append(line)
+            self._records += 1
+            self._size += len(line)
+            return self._records, self._size
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._lines = self._lines, {}
+            self._records = 0
+            self._size = 0
+        if not pending:
+            return
+        with self._io_lock:
+            for path, lines in pending.items():
+                blob = b"".join(lines)
+                if fcntl is not None and len(blob) <= ATOMIC_APPEND_LIMIT:
+                    _write_all(self._append_fd(path), blob)
+                else:
+                    _locked_append(path, blob)
+
+    def close_fds(self) -> None:
+        with self._io_lock:
+            fds, self._fds = self._fds, {}
+            for fd in fds.values():
+                os.close(fd)
+
+    def close(self) -> None:
+        self.flush()
+        self.close_fds()
+
+    def _append_fd(self, path: Path) -> int:
+        fd = self._fds.get(path)
+        if fd is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._fds[path] = fd
+        return fd
+
+
+def _write_all(fd: int, blob: bytes) -> None:
+    view = memoryview(blob)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _locked_append(path: Path, blob: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked_file(path, append=True) as handle:
+        handle.write(blob)
+
+
+@contextmanager
+def _locked_file(path: Path, *, append: bool = False) -> Iterator[BinaryIO]:
+    """Open ``path`` (creating it) and hold an exclusive lock while it is in use.
+
+    On POSIX the lock is ``flock`` on the file's own descriptor, so no ``.lock``
+    sidecar is created and the lock is released when the file is closed.
+    """
+
+    flags = os.O_CREAT | (os.O_WRONLY | os.O_APPEND if append else os.O_RDWR)
+    with open(os.open(path, flags, 0o644), "ab" if append else "r+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            yield handle
+        else:  # pragma: no cover - Windows
+            with FileLock(str(path) + ".lock"):
+                yield handle
+
+
+def _prompt_payload(record: TelemetryRecord, timestamp: str) -> dict[str, Any]:
+    return {
+        "timestamp": timestamp,
+        "agent_name": record.agent_name,
+        "operation": record.operation,
+        "prompt_hash": record.prompt_hash,
+        "prompt": record.prompt_text,
+    }
+
+
+def _response_payload(record: TelemetryRecord, timestamp: str) -> dict[str, Any]:
+    return {
+        "timestamp": timestamp,
+        "agent_name": record.agent_name,
+        "operation": record.operation,
+        "response_hash": record.response_hash,
+        "response": record.response_text,
+    }
+
+
+def _empty_summary() -> dict[str, Any]:
+    return {
+        "total_cost": 0.0,
+        "total_calls": 0,
+        "total_tokens": {
+            "input": 0,
+            "output": 0,
+            "total": 0,
+        },
+        "by_model": {},
+        "by_agent": {},
+        "by_status": {"success": 0, "failure": 0},
+    }
+
+
+def _merge_summary(path: Path, accumulator: SummaryAccumulator) -> dict[str, Any]:
+    """Fold ``accumulator``'s pending tallies into the summary file under its lock."""
+
+    pending = accumulator.drain()
+    with _locked_file(path) as handle:
+        existing = handle.read()
+        summary = _loads(existing) if existing else _empty_summary()
+        if pending is None and existing:
+            return summary
+        if pending is not None:
+            pending.merge_into(summary)
+        handle.seek(0)
+        handle.truncate()
+        handle.write(_dumps(summary, pretty=True))
+        return summary
+
+
+def _close_storage(
+    buffer: _WriteBuffer, accumulator: SummaryAccumulator, summary_path: Path
+) -> None:
+    buffer.flush()
+    _merge_summary(summary_path, accumulator)
+    buffer.close_fds()
+
+
+def _dumps_line(payload: Any) -> bytes:
+    """Encode ``payload`` as one newline-terminated JSONL line."""
+    if orjson is not None:
+        # orjson appends the newline itself, avoiding a second bytes copy.
+        return orjson.dumps(
+            payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _dumps(payload: Any, *, pretty: bool = False) -> bytes:
+    """Encode ``payload``; ``pretty`` gives the indented, key-sorted summary layout."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        return orjson.dumps(payload, option=option)
+    if pretty:
+        return json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
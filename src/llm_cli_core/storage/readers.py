@@ -2,70 +2,150 @@
 
 from __future__ import annotations
 
+import functools
 import json
-from datetime import datetime, timedelta, timezone
+import logging
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Dict, Iterator, Optional
+from typing import Any, BinaryIO
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compression
+    zstandard = None  # type: ignore[assignment]
+
+from .local import COMPRESSED_TELEMETRY_FILENAME, TELEMETRY_FILENAME
+
+logger = logging.getLogger(__name__)
 
 ISO_Z_SUFFIX = "Z"
+UTC_OFFSET_SUFFIX = "+00:00"
+READ_CHUNK_SIZE = 1 << 20
 
 
+@functools.lru_cache(maxsize=4096)
 def _parse_timestamp(value: str) -> datetime:
+    # Fast path for the exact "YYYY-MM-DDTHH:MM:SS.ffffff+00:00" shape that
+    # LocalStorage writes; anything else goes through fromisoformat.
+    if len(value) == 32 and value[10] == "T" and value.endswith(UTC_OFFSET_SUFFIX):
+        return datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            int(value[20:26]),
+            tzinfo=UTC,
+        )
     if value.endswith(ISO_Z_SUFFIX):
         value = value.replace(ISO_Z_SUFFIX, "+00:00")
     return datetime.fromisoformat(value)
 
 
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def iter_telemetry_records(
     base_dir: Path,
     start: datetime,
     end: datetime,
     *,
-    limit: Optional[int] = None,
-) -> Iterator[Dict[str, object]]:
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
     """Yield telemetry records within the provided time window."""
 
     if start.tzinfo is None:
-        start = start.replace(tzinfo=timezone.utc)
+        start = start.replace(tzinfo=UTC)
     if end.tzinfo is None:
-        end = end.replace(tzinfo=timezone.utc)
+        end = end.replace(tzinfo=UTC)
 
-    current = start.date()
-    end_date = end.date()
+    # Day directories are named by UTC date, so walk the window in UTC.
+    start_date = start.astimezone(UTC).date()
+    end_date = end.astimezone(UTC).date()
+    current = start_date
 
     count = 0
     while current <= end_date:
         date_dir = base_dir / current.isoformat()
-        telemetry_path = date_dir / "telemetry.jsonl"
-        if telemetry_path.exists():
-            with telemetry_path.open("r", encoding="utf-8") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        payload = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    ts_raw = payload.get("timestamp")
-                    if not isinstance(ts_raw, str):
-                        continue
-                    timestamp = _parse_timestamp(ts_raw)
-
-                    if timestamp < start or timestamp > end:
-                        continue
-
-                    yield payload
-                    count += 1
-                    if limit is not None and count >= limit:
-                        return
+        # Every record in a day strictly inside the window is in range; only the
+        # boundary days need their timestamps parsed and compared.
+        check_bounds = current == start_date or current == end_date
+        for line in _iter_day_lines(date_dir):
+            # The JSON parser tolerates surrounding whitespace (including a
+            # trailing "\r"), so lines are not stripped first.
+            if not line:
+                continue
+            try:
+                payload = _loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            ts_raw = payload.get("timestamp")
+            if not isinstance(ts_raw, str):
+                continue
+            if check_bounds:
+                timestamp = _parse_timestamp(ts_raw)
+                # Buffered flushes from concurrent writers interleave, so a
+                # day file is not strictly time-ordered; check every line.
+                if timestamp < start or timestamp > end:
+                    continue
+
+            yield payload
+            count += 1
+            if limit is not None and count >= limit:
+                return
         current += timedelta(days=1)
 
 
-def iter_last_n_days(base_dir: Path, days: int) -> Iterator[Dict[str, object]]:
+def _iter_day_lines(date_dir: Path) -> Iterator[bytes]:
+    """Yield a day's stored lines: compacted zstd frames first, then the live file."""
+
+    compressed_path = date_dir / COMPRESSED_TELEMETRY_FILENAME
+    if compressed_path.exists():
+        if zstandard is None:
+            logger.warning(
+                f"Skipping {compressed_path}: install zstandard to read compacted telemetry"
+            )
+        else:
+            with compressed_path.open("rb") as raw:
+                decompressor = zstandard.ZstdDecompressor()
+                with decompressor.stream_reader(raw, read_across_frames=True) as handle:
+                    yield from _iter_lines(handle)
+
+    telemetry_path = date_dir / TELEMETRY_FILENAME
+    if telemetry_path.exists():
+        with telemetry_path.open("rb") as handle:
+            yield from _iter_lines(handle)
+
+
+def _iter_lines(handle: BinaryIO) -> Iterator[bytes]:
+    """Split a binary stream on newlines, reading it in ``READ_CHUNK_SIZE`` blocks."""
+
+    carry = b""
+    while True:
+        chunk = handle.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (carry + chunk).split(b"\n") if carry else chunk.split(b"\n")
+        carry = lines.pop()
+        yield from lines
+    if carry:
+        yield carry
+
+
+def iter_last_n_days(base_dir: Path, days: int) -> Iterator[dict[str, object]]:
     """Yield records for the last N days ending now."""
 
-    end = datetime.now(timezone.utc)
+    end = datetime.now(UTC)
     start = end - timedelta(days=days)
     yield from iter_telemetry_records(base_dir, start, end)
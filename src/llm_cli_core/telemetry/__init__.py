@@ -3,21 +3,29 @@
 from .core import (
     AITelemetryTracker,
     track_ai_call,
+    flush_metrics,
     send_agent_metrics,
     TokenData,
     SessionInfo,
     OpenRouterTokens,
     AnthropicTokens,
     OpenAITokens,
+    openrouter_tokens,
+    anthropic_tokens,
+    openai_tokens,
 )
 
 __all__ = [
     "AITelemetryTracker",
     "track_ai_call",
+    "flush_metrics",
     "send_agent_metrics",
     "TokenData",
     "SessionInfo",
     "OpenRouterTokens",
     "AnthropicTokens",
     "OpenAITokens",
+    "openrouter_tokens",
+    "anthropic_tokens",
+    "openai_tokens",
 ]
\ No newline at end of file
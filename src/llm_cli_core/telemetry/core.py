@@ -25,22 +25,295 @@ Usage:
     tracker.send_metrics()
 """
 
-import os
-import time
+import atexit
+import base64
+import functools
+import hashlib
 import logging
+import os
 import subprocess
-import hashlib
-from datetime import datetime, timezone
-from typing import Dict, Any, Optional, Union, NamedTuple
-from dataclasses import dataclass
+import sys
+import threading
+import time
+import weakref
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterable
 from contextlib import contextmanager
-
-from llm_cli_core.config import get_config
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    NamedTuple,
+    Optional,
+    cast,
+)
+from urllib.parse import quote_plus
+
+if TYPE_CHECKING:
+    import urllib3
+
+try:  # Optional fast non-cryptographic hash
+    import xxhash  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
+
+from llm_cli_core.config import Config, get_config
 from llm_cli_core.storage import LocalStorage, TelemetryRecord
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared connection pool so repeated pushes reuse keep-alive connections
+# instead of opening a new TCP connection per call. Created on first push so
+# importing this module (and building trackers) doesn't pay for importing
+# urllib3.
+_POOL: Optional["urllib3.PoolManager"] = None
+_POOL_LOCK = threading.Lock()
+_PUSH_HEADERS = {"Content-Type": "text/plain"}
+
+
+def _get_pool() -> "urllib3.PoolManager":
+    global _POOL
+    pool = _POOL
+    if pool is not None:
+        return pool
+    with _POOL_LOCK:
+        if _POOL is None:
+            try:
+                import urllib3
+            except ImportError as exc:
+                raise RuntimeError(
+                    "The 'urllib3' package is required to push telemetry metrics"
+                ) from exc
+
+            # retries=False keeps pushes single-shot, as before.
+            _POOL = urllib3.PoolManager(num_pools=4, maxsize=8, retries=False)
+        return _POOL
+
+# Background pushes are coalesced: the worker gathers up to PUSH_MAX_BATCH
+# calls, waiting at most PUSH_FLUSH_INTERVAL seconds, before posting.
+PUSH_MAX_BATCH = 100
+PUSH_FLUSH_INTERVAL = 1.0
+# Pending calls are held in a ring of this many slots; on overrun the oldest
+# call is dropped and counted rather than blocking the caller.
+PUSH_RING_SIZE = 4096
+
+# One exposition sample: (metric name with label block, value)
+_Sample = tuple[str, Any]
+# (group URL awaiting its timestamp, samples, optional persistence callback)
+_PushJob = tuple[str, list[_Sample], Callable[[], None] | None]
+
+
+def _post_metrics(url: str, metrics: bytes) -> bool:
+    """POST one pushgateway payload, logging rather than raising on failure"""
+    try:
+        response = _get_pool().request(
+            "POST", url, body=metrics, headers=_PUSH_HEADERS, timeout=5.0
+        )
+    except Exception as e:  # noqa: BLE001 - an unreachable gateway must not reach callers
+        logger.warning(f"Telemetry error: {e}")
+        return False
+
+    if response.status != 200:
+        logger.warning(f"Telemetry failed: HTTP {response.status}")
+        return False
+    return True
+
+
+def _render_samples(samples: Iterable[_Sample]) -> bytes:
+    """Render samples as a text exposition body"""
+    lines = [f"{series} {value}" for series, value in samples]
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+class _MetricsDispatcher:
+    """Drains pending pushgateway payloads (and their local persistence) on a
+    lazily started daemon thread
+
+    Calls wait in a bounded ring; when it overruns, the oldest call's push is
+    dropped and counted, and the count is pushed as
+    ``ai_agent_telemetry_dropped_total`` with the next batch; the submitting
+    thread still runs its local persistence. The worker collects up to
+    ``max_batch`` calls or waits ``flush_interval`` seconds. Calls sharing a
+    grouping key (agent, session and user) are coalesced into one POST, with
+    samples of identical series summed.
+    """
+
+    def __init__(
+        self,
+        capacity: int = PUSH_RING_SIZE,
+        max_batch: int = PUSH_MAX_BATCH,
+        flush_interval: float = PUSH_FLUSH_INTERVAL,
+    ):
+        self._ring: deque[_PushJob] = deque()
+        self.capacity = capacity
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._unreported_drops = 0
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        # Guards the ring and counters; signalled when calls arrive, when a
+        # flush is requested and when a batch completes.
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._flush_requested = False
+
+    def submit(
+        self,
+        group_url: str,
+        samples: list[_Sample],
+        persist: Callable[[], None] | None = None,
+    ) -> bool:
+        """Queue a call's samples and its ``persist`` callback without blocking
+        on the network"""
+        self._ensure_worker()
+        overrun = None
+        with self._cond:
+            if len(self._ring) >= self.capacity:
+                _, _, overrun = self._ring.popleft()
+                self._pending -= 1
+                self.dropped += 1
+                self._unreported_drops += 1
+                logger.debug("Telemetry ring full, dropped the oldest pending push")
+            self._ring.append((group_url, samples, persist))
+            self._pending += 1
+            self._cond.notify_all()
+        if overrun is not None:
+            # Only the push is shed under pressure; the record is still stored.
+            _run_persist(overrun)
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every pending payload has been posted (or timeout expires)"""
+        with self._cond:
+            if not self._pending:
+                return True
+            # Have the worker post its partial batch straight away.
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def take_persists(self) -> list[Callable[[], None]]:
+        """Empty the ring and return its calls' ``persist`` callbacks, giving
+        up on their pushes"""
+        with self._cond:
+            jobs = list(self._ring)
+            self._ring.clear()
+            self._pending -= len(jobs)
+            if self._pending == 0:
+                self._cond.notify_all()
+        return [persist for _, _, persist in jobs if persist is not None]
+
+    def _ensure_worker(self) -> None:
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._start_lock:
+            # Re-check under the lock; also restarts the worker after fork().
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="llm-telemetry-push", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch, dropped = self._collect()
+            try:
+                self._deliver(batch, dropped)
+            except Exception as e:  # noqa: BLE001 - keep the worker alive
+                logger.warning(f"Telemetry error: {e}")
+            finally:
+                with self._cond:
+                    self._pending -= len(batch)
+                    if self._pending == 0:
+                        self._cond.notify_all()
+
+    def _collect(self) -> tuple[list[_PushJob], int]:
+        """Wait for a call, then let the batch fill until it is full, the
+        interval lapses or a flush is requested"""
+        with self._cond:
+            while not self._ring:
+                self._cond.wait()
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._ring) < self.max_batch and not self._flush_requested:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._flush_requested = False
+            count = min(len(self._ring), self.max_batch)
+            batch = [self._ring.popleft() for _ in range(count)]
+            dropped, self._unreported_drops = self._unreported_drops, 0
+        return batch, dropped
+
+    @staticmethod
+    def _deliver(batch: list[_PushJob], dropped: int = 0) -> None:
+        groups: dict[str, dict[str, Any]] = {}
+        for group_url, samples, _ in batch:
+            totals = groups.setdefault(group_url, {})
+            for series, value in samples:
+                totals[series] = totals.get(series, 0) + value
+        if dropped:
+            # Report drops once, alongside the first group in the batch.
+            next(iter(groups.values()))["ai_agent_telemetry_dropped_total"] = dropped
+
+        # Local writes go first so they never wait on an unreachable gateway.
+        for _, _, persist in batch:
+            if persist is not None:
+                _run_persist(persist)
+
+        timestamp_id = int(time.time() * 1000)
+        for group_url, totals in groups.items():
+            url = f"{group_url}{timestamp_id}"
+            if _post_metrics(url, _render_samples(totals.items())):
+                logger.debug(f"Telemetry sent: {url}")
+
+
+def _run_persist(persist: Callable[[], None]) -> None:
+    """Run a local write, logging rather than raising on failure"""
+    try:
+        persist()
+    except Exception as e:  # noqa: BLE001 - local storage failures must not reach callers
+        logger.warning(f"Failed to persist telemetry locally: {e}")
+
+
+_DISPATCHER = _MetricsDispatcher()
+
+
+def flush_metrics(timeout: float | None = None) -> bool:
+    """Wait for queued telemetry pushes to be delivered
+
+    Returns False if the timeout expired with pushes still pending.
+    """
+    return _DISPATCHER.flush(timeout)
+
+
+# Storages that trackers may persist to from the push worker.
+_WORKER_STORAGES: "weakref.WeakSet[LocalStorage]" = weakref.WeakSet()
+
+
+def _flush_at_exit() -> None:
+    """Give queued pushes a brief chance to go out, then store every call
+    still queued and write what was persisted
+
+    Calls left in the ring (e.g. behind a hanging gateway) are persisted here
+    and their pushes abandoned. LocalStorage's own exit hook can run before
+    this one, so storages the worker writes to are flushed again afterwards.
+    """
+    flush_metrics(2.0)
+    for persist in _DISPATCHER.take_persists():
+        _run_persist(persist)
+    for storage in list(_WORKER_STORAGES):
+        _run_persist(storage.flush)
+
+
+atexit.register(_flush_at_exit)
+
 
 class TokenData(NamedTuple):
     """Standardized token data structure"""
@@ -50,108 +323,373 @@ class TokenData(NamedTuple):
     output: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionInfo:
     """Claude Code session information"""
 
     session_id: str
     user_id: str
     working_directory: str
-    start_time: str
+    session_start_time: str
+
+    @property
+    def start_time(self) -> str:
+        """Backwards-compatible alias for ``session_start_time``"""
+        return self.session_start_time
 
     @classmethod
     def detect(cls) -> "SessionInfo":
-        """Detect session info using environment variables (more reliable than SDK)"""
+        """Detect session info using environment variables (more reliable than SDK)
+
+        Fallback sessions are hour-bucketed, so the detected info is cached per
+        process and only recomputed when the hour, user or working directory
+        changes.
+        """
+        global _SESSION_CACHE
+
         # Try Claude Code environment variables first
-        session_id = os.getenv("CLAUDE_SESSION_ID")
-        user_id = os.getenv("CLAUDE_USER_ID") or os.getenv("USER", "unknown")
+        explicit_session_id = os.getenv("CLAUDE_SESSION_ID")
+        user_id = os.getenv("CLAUDE_USER_ID") or os.getenv("USER") or "unknown"
+
+        hour = int(time.time() // 3600)
+        working_directory = os.getcwd()
+        key = (hour, user_id, working_directory)
+        cached = _SESSION_CACHE
+        if not explicit_session_id and cached is not None and cached[0] == key:
+            return cached[1]
+
+        session_id = explicit_session_id
 
         # Fallback: generate pseudo-session from environment
         if not session_id:
             env_data = (
-                f"{user_id}-{os.getcwd()}-{time.time()//3600}"  # Hour-based sessions
+                f"{user_id}-{working_directory}-{float(hour)}"  # Hour-based sessions
             )
-            # Format: "env-{8-char-hash}" where hash is MD5 of user+directory+hour
+            # Format: "env-{8-char-hash}" where hash is of user+directory+hour
             # Example: "env-a1b2c3d4" - provides session continuity within same hour
-            session_id = f"env-{hashlib.md5(env_data.encode()).hexdigest()[:8]}"
+            session_id = f"env-{_hash8(env_data)}"
 
-        return cls(
+        info = cls(
             session_id=session_id,
             user_id=user_id,
-            working_directory=os.getcwd(),
-            start_time=time.strftime("%Y-%m-%d %H:%M:%S"),
+            working_directory=working_directory,
+            session_start_time=_local_time_str(),
         )
+        if not explicit_session_id:
+            _SESSION_CACHE = (key, info)
+        return info
+
+
+def _store_record(
+    storage: LocalStorage, record: TelemetryRecord, hash_algorithm: str
+) -> None:
+    """Hash the record's prompt/response text and write it to local storage"""
+    record.prompt_hash = AITelemetryTracker._hash_text(record.prompt_text, hash_algorithm)
+    record.response_hash = AITelemetryTracker._hash_text(
+        record.response_text, hash_algorithm
+    )
+    try:
+        storage.record(record)
+    except Exception as exc:  # noqa: BLE001  # pragma: no cover - never crash callers
+        logger.warning(f"Failed to persist telemetry locally: {exc}")
+
+
+# Retries and deterministic workflows resend identical prompts, so recent
+# digests are kept; the cache holds references to at most this many texts.
+HASH_CACHE_SIZE = 128
+
+
+@functools.lru_cache(maxsize=HASH_CACHE_SIZE)
+def _hash_digest(value: str | bytes, algorithm: str) -> str:
+    """Prefixed digest of a prompt or response text"""
+    data = value if isinstance(value, bytes) else value.encode("utf-8", "replace")
+    if algorithm == "sha256":
+        return f"sha256:{hashlib.sha256(data).hexdigest()}"
+    return f"blake2b:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+
+
+def _hash8(value: str) -> str:
+    """8-hex-char identifier hash; not for security use"""
+    if xxhash is not None:
+        return str(xxhash.xxh64(value).hexdigest()[:8])
+    return f"{zlib.crc32(value.encode()) & 0xFFFFFFFF:08x}"
+
+
+# Cached fallback session: ((hour bucket, user id, cwd), SessionInfo).
+_SESSION_CACHE: tuple[tuple[int, str, str], SessionInfo] | None = None
+
+# Last formatted local "YYYY-MM-DD HH:MM:SS" and the epoch second it is for.
+_LAST_SEC = -1
+_LAST_ISO = ""
+
+
+def _local_time_str() -> str:
+    """Local wall-clock time to the second, reformatted only on second rollover"""
+    global _LAST_SEC, _LAST_ISO
+    now = int(time.time())
+    if now != _LAST_SEC:
+        # Store the text before the second so a thread that sees the new
+        # second also sees its string.
+        _LAST_ISO = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _LAST_SEC = now
+    return _LAST_ISO
+
+
+# Git branch per working directory: cwd -> (monotonic expiry, branch).
+GIT_BRANCH_TTL = 60.0
+_GIT_BRANCH_CACHE: dict[str, tuple[float, str | None]] = {}
+_GIT_BRANCH_LOCK = threading.Lock()
+
+
+def _find_git_head(start: str) -> str | None:
+    """Path of the HEAD file for the repository containing ``start``, or None
+    outside a repository
+
+    Worktrees and submodules have a ``.git`` file pointing at their git
+    directory; an unexpected layout raises OSError.
+    """
+    path = start
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return os.path.join(dot_git, "HEAD")
+        if os.path.isfile(dot_git):
+            with open(dot_git, "rb") as fh:
+                line = fh.readline().strip()
+            if not line.startswith(b"gitdir:"):
+                raise OSError(f"unrecognised .git file: {dot_git}")
+            # A relative gitdir is relative to the directory holding .git.
+            return os.path.join(path, os.fsdecode(line[7:].strip()), "HEAD")
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _escape_label_value(value: Any) -> str:
+    """Escape a label value for the Prometheus text exposition format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _grouping_segment(name: str, value: Any) -> str:
+    """Encode one pushgateway grouping key as URL path segments
+
+    Values containing "/" (or empty values) use the pushgateway's base64 form.
+    """
+    value = str(value)
+    if not value or "/" in value:
+        encoded = base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+        return f"{name}@base64/{encoded or '='}"
+    return f"{name}/{quote_plus(value)}"
+
+
+class _PushLabels(NamedTuple):
+    """Pre-formatted pushgateway URL path and series names for one tracker"""
+
+    model: str
+    url_path: str
+    usage_head: str
+    usage_tail: str
+    usage_success: str
+    usage_failure: str
+    duration_series: str
+    tokens_series: str
+    input_series: str
+    output_series: str
+    cost_series: str
+    sessions_series: str
 
 
 # Token Extractors for Different APIs
+# (total, input, output) usage keys shared by OpenAI-compatible APIs
+_OPENAI_USAGE_KEYS = ("total_tokens", "prompt_tokens", "completion_tokens")
+_NO_USAGE: dict[str, Any] = {}
+
+
+def _extract(usage: dict[str, Any], keys: tuple[str, str, str]) -> TokenData:
+    """Build TokenData from a usage mapping via its (total, input, output) keys"""
+    get = usage.get
+    return TokenData(get(keys[0], 0), get(keys[1], 0), get(keys[2], 0))
+
+
+def openrouter_tokens(response_json: dict[str, Any]) -> TokenData:
+    """Extract tokens from OpenRouter API response"""
+    return _extract(response_json.get("usage", _NO_USAGE), OpenRouterTokens.KEYS)
+
+
+def anthropic_tokens(response) -> TokenData:
+    """Extract tokens from Anthropic API response"""
+    try:
+        usage = response.usage
+    except AttributeError:
+        return TokenData()
+    input_tokens = usage.input_tokens
+    output_tokens = usage.output_tokens
+    return TokenData(input_tokens + output_tokens, input_tokens, output_tokens)
+
+
+def openai_tokens(response_json: dict[str, Any]) -> TokenData:
+    """Extract tokens from OpenAI/compatible API response"""
+    return _extract(response_json.get("usage", _NO_USAGE), OpenAITokens.KEYS)
+
+
+# Back-compat extractor wrappers exposing the result as ``.data``
 class OpenRouterTokens:
     """Extract tokens from OpenRouter API response"""
 
-    def __init__(self, response_json: Dict[str, Any]):
-        usage = response_json.get("usage", {})
-        self.data = TokenData(
-            total=usage.get("total_tokens", 0),
-            input=usage.get("prompt_tokens", 0),
-            output=usage.get("completion_tokens", 0),
-        )
+    __slots__ = ("data",)
+    KEYS = _OPENAI_USAGE_KEYS
+
+    def __init__(self, response_json: dict[str, Any]):
+        self.data = openrouter_tokens(response_json)
 
 
 class AnthropicTokens:
     """Extract tokens from Anthropic API response"""
 
+    __slots__ = ("data",)
+
     def __init__(self, response):
-        if hasattr(response, "usage"):
-            self.data = TokenData(
-                total=response.usage.input_tokens + response.usage.output_tokens,
-                input=response.usage.input_tokens,
-                output=response.usage.output_tokens,
-            )
-        else:
-            self.data = TokenData()
+        self.data = anthropic_tokens(response)
 
 
 class OpenAITokens:
     """Extract tokens from OpenAI/compatible API response"""
 
-    def __init__(self, response_json: Dict[str, Any]):
-        usage = response_json.get("usage", {})
-        self.data = TokenData(
-            total=usage.get("total_tokens", 0),
-            input=usage.get("prompt_tokens", 0),
-            output=usage.get("completion_tokens", 0),
-        )
+    __slots__ = ("data",)
+    KEYS = _OPENAI_USAGE_KEYS
+
+    def __init__(self, response_json: dict[str, Any]):
+        self.data = openai_tokens(response_json)
+
+
+# Marks a tracker whose LocalStorage has not been created yet.
+_UNSET = object()
+
+# LocalStorage shared by every tracker built from the same Config, so its
+# write buffer, day-path cache and summary tallies are not rebuilt per
+# tracker: (config, storage or None when storage is disabled).
+_SHARED_STORAGE: tuple[Config, LocalStorage | None] | None = None
+_SHARED_STORAGE_LOCK = threading.Lock()
+
+
+def _shared_storage(config: Config) -> LocalStorage | None:
+    """Process-wide LocalStorage for ``config``, replaced when the config
+    is reloaded"""
+    global _SHARED_STORAGE
+    shared = _SHARED_STORAGE
+    if shared is None or shared[0] is not config:
+        with _SHARED_STORAGE_LOCK:
+            shared = _SHARED_STORAGE
+            if shared is None or shared[0] is not config:
+                storage = LocalStorage(config) if config.storage_enabled else None
+                shared = _SHARED_STORAGE = (config, storage)
+    return shared[1]
+
+
+def _intern(value: Any) -> Any:
+    """Intern agent/operation/model names, which repeat across calls, so
+    trackers share one copy and label-cache checks hit the identity fast path"""
+    return sys.intern(value) if type(value) is str else value
 
 
 class AITelemetryTracker:
     """Tracks AI operations and sends telemetry data"""
 
+    __slots__ = (
+        "_label_cache",
+        "_storage",
+        "agent_name",
+        "config",
+        "cost",
+        "error_message",
+        "metadata",
+        "model",
+        "operation",
+        "prompt_text",
+        "response_text",
+        "session_info",
+        "start_time",
+        "success",
+        "tokens",
+    )
+
+    # Push URL path and series templates, filled in by _ensure_labels. Label
+    # values are escaped and grouping segments encoded before substitution.
+    _URL_TMPL = "/metrics/job/ai_agents/%s/%s/%s/timestamp/"
+    _USAGE_TMPL = "ai_agent_usage_total{%s%s%s}"
+    _USAGE_HEAD_TMPL = 'agent_name="%s",operation="%s",model="%s",success="'
+    _USAGE_TAIL_TMPL = '",user="%s"'
+    _LABELS_TMPL = 'agent_name="%s",model="%s",user="%s"'
+    _DURATION_TMPL = (
+        'ai_agent_duration_ms_total{agent_name="%s",session_id="%s",user="%s"}'
+    )
+    _SESSIONS_TMPL = (
+        'ai_agent_sessions_total{session_id="%s",user="%s",working_directory="%s"}'
+    )
+
     def __init__(self, agent_name: str, operation: str):
-        self.agent_name = agent_name
-        self.operation = operation
-        self.start_time = None
+        self.session_info = SessionInfo.detect()
+        self.config = get_config()
+        self._storage: LocalStorage | None | object = _UNSET
+        self._reset_call_state(agent_name, operation)
+
+    @property
+    def storage(self) -> LocalStorage | None:
+        """Local storage backend, created on first use (None when disabled)"""
+        if self._storage is _UNSET:
+            self.storage = _shared_storage(self.config)
+        return cast(LocalStorage | None, self._storage)
+
+    @storage.setter
+    def storage(self, value: LocalStorage | None) -> None:
+        if value is not None:
+            _WORKER_STORAGES.add(value)
+        self._storage = value
+
+    def reset(self, agent_name: str, operation: str) -> None:
+        """Prepare the tracker for a new call, keeping its storage when the
+        configuration is unchanged"""
+        self.session_info = SessionInfo.detect()
+        config = get_config()
+        if config is not self.config:
+            self.config = config
+            self._storage = _UNSET
+        self._reset_call_state(agent_name, operation)
+
+    def _reset_call_state(self, agent_name: str, operation: str) -> None:
+        self.agent_name = _intern(agent_name)
+        self.operation = _intern(operation)
+        self.start_time: float | None = None
         self.tokens = TokenData()
         self.cost = 0.0
         self.model = "unknown"
         self.success = True
-        self.session_info = SessionInfo.detect()
-        self.config = get_config()
-        self.storage = (
-            LocalStorage(self.config) if self.config.storage_enabled else None
-        )
-        self.prompt_text: Optional[str] = None
-        self.response_text: Optional[str] = None
-        self.metadata: Dict[str, Any] = {}
-        self.error_message: Optional[str] = None
+        self.prompt_text: str | None = None
+        self.response_text: str | None = None
+        # Seeded with the per-call fields so records can use it as-is; user
+        # metadata and errors are written straight into it.
+        self.metadata: dict[str, Any] = {
+            "project": self.config.project_name,
+            "working_directory": self.session_info.working_directory,
+            "session_start": self.session_info.session_start_time,
+        }
+        self.error_message: str | None = None
+        self._label_cache: _PushLabels | None = None
 
     def start(self):
         """Start timing the operation"""
         self.start_time = time.time()
 
     def record_tokens(
-        self, token_extractor: Union[OpenRouterTokens, AnthropicTokens, OpenAITokens]
+        self,
+        token_extractor: TokenData | OpenRouterTokens | AnthropicTokens | OpenAITokens,
     ):
         """Record token usage from API response"""
-        self.tokens = token_extractor.data
+        if isinstance(token_extractor, TokenData):
+            self.tokens = token_extractor
+        else:
+            self.tokens = token_extractor.data
 
     def record_cost(self, cost: float):
         """Record operation cost"""
@@ -159,7 +697,8 @@ class AITelemetryTracker:
 
     def record_model(self, model: str):
         """Record AI model used"""
-        self.model = model
+        self.model = _intern(model)
+        self._label_cache = None
 
     def record_prompt(self, prompt: str):
         """Record prompt text for optional storage and hashing."""
@@ -169,13 +708,14 @@ class AITelemetryTracker:
         """Record response text for optional storage and hashing."""
         self.response_text = response
 
-    def update_metadata(self, metadata: Dict[str, Any]):
+    def update_metadata(self, metadata: dict[str, Any]):
         """Merge additional metadata into the telemetry payload."""
         self.metadata.update(metadata)
 
     def record_error(self, error: str):
         """Capture error message for telemetry persistence."""
         self.error_message = error
+        self.metadata["error"] = error
 
     def record_response(
         self,
@@ -190,62 +730,182 @@ class AITelemetryTracker:
         self.record_model(model)
         self.success = success
 
-    def send_metrics(self, pushgateway_url: Optional[str] = None) -> bool:
-        """Send telemetry metrics to monitoring stack"""
+    def send_metrics(self, pushgateway_url: str | None = None) -> bool:
+        """Queue telemetry metrics for background delivery to the monitoring stack
+
+        Returns True once the push is queued; the pushgateway POST and the
+        local storage write happen on a daemon thread, so the caller never
+        waits on either. Set ``LLM_TELEMETRY_SYNC=true`` to send inline.
+        The tracker should not be modified after calling this.
+        """
+        if self.config.telemetry_sync:
+            return self.send_metrics_sync(pushgateway_url)
+
+        push = self._prepare_push(pushgateway_url)
+        if push is None:
+            return False
+
+        group_url, samples, duration_ms = push
+        persist = None
+        storage = self._persist_storage()
+        if storage is not None:
+            # Snapshot the call now; the tracker may be reused before the
+            # worker gets to it. Hashing is left to the worker.
+            persist = functools.partial(
+                _store_record,
+                storage,
+                self._build_record(
+                    duration_ms, datetime.now(UTC), snapshot=True
+                ),
+                self.config.hash_algorithm,
+            )
+        return _DISPATCHER.submit(group_url, samples, persist)
+
+    def send_metrics_sync(self, pushgateway_url: str | None = None) -> bool:
+        """Send telemetry metrics to monitoring stack and wait for the response"""
+        push = self._prepare_push(pushgateway_url)
+        if push is None:
+            return False
+
+        group_url, samples, duration_ms = push
+        success = _post_metrics(
+            f"{group_url}{int(time.time() * 1000)}", _render_samples(samples)
+        )
+        if success:
+            logger.debug(
+                f"Telemetry sent: {self.agent_name} {self.operation} "
+                f"({duration_ms}ms, {self.tokens.total} tokens)"
+            )
+        self._persist_telemetry(duration_ms)
+        return success
+
+    def _prepare_push(
+        self, pushgateway_url: str | None
+    ) -> tuple[str, list[_Sample], int] | None:
+        """Build the pushgateway group URL (awaiting its timestamp segment) and
+        samples, or None if telemetry is disabled or the tracker never started"""
+        if not self.config.telemetry_enabled:
+            return None
         if self.start_time is None:
             logger.warning(
                 "Telemetry tracker was never started - cannot calculate duration"
             )
-            return False
+            return None
 
         duration_ms = int((time.time() - self.start_time) * 1000)
+        push = self._ensure_labels()
 
-        try:
-            import requests
-
-            timestamp_id = int(time.time() * 1000)
-            session_id = self.session_info.session_id
-            user_id = self.session_info.user_id
-
-            url_base = pushgateway_url or self.config.pushgateway_url
-            url = f"{url_base}/metrics/job/ai_agents/agent/{self.agent_name}/session_id/{session_id}/user_id/{user_id}/timestamp/{timestamp_id}"
-
-            # Enhanced metrics with user correlation (proper pushgateway format)
-            metrics = f"""ai_agent_usage_total{{agent_name="{self.agent_name}",operation="{self.operation}",model="{self.model}",success="{self.success}",user="{user_id}"}} 1
-ai_agent_duration_ms_total{{agent_name="{self.agent_name}",session_id="{session_id}",user="{user_id}"}} {duration_ms}
-ai_agent_tokens_total{{agent_name="{self.agent_name}",model="{self.model}",user="{user_id}"}} {self.tokens.total}
-ai_agent_input_tokens_total{{agent_name="{self.agent_name}",model="{self.model}",user="{user_id}"}} {self.tokens.input}
-ai_agent_output_tokens_total{{agent_name="{self.agent_name}",model="{self.model}",user="{user_id}"}} {self.tokens.output}
-ai_agent_cost_usd_total{{agent_name="{self.agent_name}",model="{self.model}",user="{user_id}"}} {self.cost}
-ai_agent_sessions_total{{session_id="{session_id}",user="{user_id}",working_directory="{self.session_info.working_directory}"}} 1
-"""
+        url_base = pushgateway_url or self.config.pushgateway_url
 
-            response = requests.post(
-                url, data=metrics, headers={"Content-Type": "text/plain"}, timeout=5
+        # Enhanced metrics with user correlation (proper pushgateway format).
+        # Series names come from the per-tracker cache, so only the numeric
+        # values vary per send.
+        if self.success is True:
+            usage_series = push.usage_success
+        elif self.success is False:
+            usage_series = push.usage_failure
+        else:
+            usage_series = self._USAGE_TMPL % (
+                push.usage_head,
+                self.success,
+                push.usage_tail,
             )
-            success = response.status_code == 200
+        tokens = self.tokens
+        samples = [
+            (usage_series, 1),
+            (push.duration_series, duration_ms),
+            (push.tokens_series, tokens.total),
+            (push.input_series, tokens.input),
+            (push.output_series, tokens.output),
+            (push.cost_series, self.cost),
+            (push.sessions_series, 1),
+        ]
+        return f"{url_base}{push.url_path}", samples, duration_ms
+
+    def _ensure_labels(self) -> "_PushLabels":
+        """Return the cached URL path and label blocks, rebuilding on model change"""
+        cache = self._label_cache
+        if cache is not None and cache.model == self.model:
+            return cache
+
+        # Label values are escaped for the text exposition format and URL
+        # grouping values are path-encoded, so arbitrary names stay well-formed.
+        esc = _escape_label_value
+        agent_name = esc(self.agent_name)
+        model = esc(self.model)
+        session_id = esc(self.session_info.session_id)
+        user_id = esc(self.session_info.user_id)
+        url_path = self._URL_TMPL % (
+            _grouping_segment("agent", self.agent_name),
+            _grouping_segment("session_id", self.session_info.session_id),
+            _grouping_segment("user_id", self.session_info.user_id),
+        )
+        usage_head = self._USAGE_HEAD_TMPL % (agent_name, esc(self.operation), model)
+        usage_tail = self._USAGE_TAIL_TMPL % user_id
+        labels = self._LABELS_TMPL % (agent_name, model, user_id)
+        cache = _PushLabels(
+            model=self.model,
+            url_path=url_path,
+            usage_head=usage_head,
+            usage_tail=usage_tail,
+            usage_success=self._USAGE_TMPL % (usage_head, True, usage_tail),
+            usage_failure=self._USAGE_TMPL % (usage_head, False, usage_tail),
+            duration_series=self._DURATION_TMPL % (agent_name, session_id, user_id),
+            tokens_series=f"ai_agent_tokens_total{{{labels}}}",
+            input_series=f"ai_agent_input_tokens_total{{{labels}}}",
+            output_series=f"ai_agent_output_tokens_total{{{labels}}}",
+            cost_series=f"ai_agent_cost_usd_total{{{labels}}}",
+            sessions_series=self._SESSIONS_TMPL % (
+                session_id,
+                user_id,
+                esc(self.session_info.working_directory),
+            ),
+        )
+        self._label_cache = cache
+        return cache
+
+    def is_empty(self) -> bool:
+        """True when the call recorded no tokens, cost, text or error"""
+        return (
+            self.tokens.total == 0
+            and self.cost == 0.0
+            and self.prompt_text is None
+            and self.response_text is None
+            and self.error_message is None
+            and self.success is True
+        )
 
-            if success:
-                logger.debug(
-                    f"Telemetry sent: {self.agent_name} {self.operation} ({duration_ms}ms, {self.tokens.total} tokens)"
-                )
-            else:
-                logger.warning(f"Telemetry failed: HTTP {response.status_code}")
+    def _persist_storage(self) -> LocalStorage | None:
+        """Storage to record this call in, or None when it is not persisted"""
+        if not self.config.track_empty_calls and self.is_empty():
+            return None
+        return self.storage
 
-            self._persist_telemetry(duration_ms)
-            return success
+    def _persist_telemetry(
+        self, duration_ms: int, timestamp: datetime | None = None
+    ) -> None:
+        storage = self._persist_storage()
+        if storage is None:
+            return
 
-        except Exception as e:
-            logger.warning(f"Telemetry error: {e}")
-            self._persist_telemetry(duration_ms)
-            return False
+        if timestamp is None:
+            timestamp = datetime.now(UTC)
+        _store_record(
+            storage,
+            self._build_record(duration_ms, timestamp),
+            self.config.hash_algorithm,
+        )
 
-    def _persist_telemetry(self, duration_ms: int) -> None:
-        if not self.storage:
-            return
+    def _build_record(
+        self, duration_ms: int, timestamp: datetime, snapshot: bool = False
+    ) -> TelemetryRecord:
+        """Build this call's record; hashes are filled in by _store_record
 
-        timestamp = datetime.now(timezone.utc)
-        record = TelemetryRecord(
+        Unless ``snapshot`` is set the record shares the tracker's metadata
+        dict, so it must be stored before the tracker is changed or reused.
+        """
+        metadata = self._collect_metadata()
+        return TelemetryRecord(
             timestamp=timestamp,
             agent_name=self.agent_name,
             operation=self.operation,
@@ -258,44 +918,68 @@ ai_agent_sessions_total{{session_id="{session_id}",user="{user_id}",working_dire
             output_tokens=int(self.tokens.output),
             cost_usd=float(self.cost),
             success=bool(self.success),
-            prompt_hash=self._hash_text(self.prompt_text),
-            response_hash=self._hash_text(self.response_text),
-            metadata=self._collect_metadata(),
+            prompt_hash=None,
+            response_hash=None,
+            metadata=metadata.copy() if snapshot else metadata,
             prompt_text=self.prompt_text,
             response_text=self.response_text,
         )
 
-        try:
-            self.storage.record(record)
-        except Exception as exc:  # pragma: no cover - storage failures shouldn't crash callers
-            logger.warning(f"Failed to persist telemetry locally: {exc}")
-
-    def _collect_metadata(self) -> Dict[str, Any]:
-        metadata: Dict[str, Any] = {
-            "project": self.config.project_name,
-            "working_directory": self.session_info.working_directory,
-            "session_start": self.session_info.start_time,
-        }
-
-        branch = self._detect_git_branch()
-        if branch:
-            metadata["git_branch"] = branch
-
-        if self.error_message:
-            metadata["error"] = self.error_message
-
-        metadata.update(self.metadata)
+    def _collect_metadata(self) -> dict[str, Any]:
+        metadata = self.metadata
+        if "git_branch" not in metadata:
+            branch = self._detect_git_branch()
+            if branch:
+                metadata["git_branch"] = branch
         return metadata
 
     @staticmethod
-    def _hash_text(value: Optional[str]) -> Optional[str]:
+    def _hash_text(
+        value: str | bytes | None, algorithm: str = "blake2b"
+    ) -> str | None:
         if not value:
             return None
-        digest = hashlib.sha256(value.encode("utf-8")).hexdigest()
-        return f"sha256:{digest}"
+        return _hash_digest(value, algorithm)
+
+    @staticmethod
+    def _detect_git_branch() -> str | None:
+        """Current git branch for the working directory, cached for GIT_BRANCH_TTL seconds"""
+        cwd = os.getcwd()
+        now = time.monotonic()
+        cached = _GIT_BRANCH_CACHE.get(cwd)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        with _GIT_BRANCH_LOCK:
+            # Another thread may have refreshed it while we waited.
+            cached = _GIT_BRANCH_CACHE.get(cwd)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+            branch = AITelemetryTracker._read_git_branch(cwd)
+            _GIT_BRANCH_CACHE[cwd] = (time.monotonic() + GIT_BRANCH_TTL, branch)
+            return branch
 
     @staticmethod
-    def _detect_git_branch() -> Optional[str]:
+    def _read_git_branch(cwd: str) -> str | None:
+        """Branch named by the repository's HEAD file, without running git
+
+        Falls back to ``git rev-parse`` only when the git directory cannot be
+        read directly.
+        """
+        try:
+            head_path = _find_git_head(cwd)
+            if head_path is None:
+                return None
+            with open(head_path, "rb") as fh:
+                head = fh.read(1024)
+        except OSError:
+            return AITelemetryTracker._run_git_branch()
+        if head.startswith(b"ref: refs/heads/"):
+            return head[16:].strip().decode("utf-8", "replace") or None
+        # Detached HEAD
+        return None
+
+    @staticmethod
+    def _run_git_branch() -> str | None:
         try:
             result = subprocess.run(
                 ["git", "rev-parse", "--abbrev-ref", "HEAD"],
@@ -321,7 +1005,16 @@ def track_ai_call(agent_name: str, operation: str):
             tracker.record_tokens(OpenRouterTokens(response.json()))
             tracker.record_cost(0.003)
     """
-    tracker = AITelemetryTracker(agent_name, operation)
+    if not get_config().telemetry_enabled:
+        yield _NULL_TRACKER
+        return
+
+    pool = _tracker_pool()
+    if pool:
+        tracker = pool.pop()
+        tracker.reset(agent_name, operation)
+    else:
+        tracker = AITelemetryTracker(agent_name, operation)
     tracker.start()
 
     try:
@@ -332,6 +1025,89 @@ def track_ai_call(agent_name: str, operation: str):
         raise
     finally:
         tracker.send_metrics()
+        # The tracker is reused by a later call, so callers must not keep it
+        # past the with-block.
+        if len(pool) < TRACKER_POOL_SIZE:
+            pool.append(tracker)
+
+
+# Per-thread free list of trackers reused by track_ai_call.
+TRACKER_POOL_SIZE = 8
+_TRACKER_POOL = threading.local()
+
+
+def _tracker_pool() -> list[AITelemetryTracker]:
+    pool = getattr(_TRACKER_POOL, "trackers", None)
+    if pool is None:
+        pool = _TRACKER_POOL.trackers = []
+    return pool
+
+
+class _NullTracker:
+    """Tracker handed out by track_ai_call when telemetry is disabled
+
+    Accepts the same recording calls as AITelemetryTracker and drops them,
+    so opted-out users pay no session detection, storage or push cost.
+    """
+
+    agent_name = ""
+    operation = ""
+    start_time: float | None = None
+    tokens = TokenData()
+    cost = 0.0
+    model = "unknown"
+    success = True
+    prompt_text = None
+    response_text = None
+    error_message = None
+    storage = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Shared by every caller, so attribute writes are discarded too.
+        pass
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return {}
+
+    def start(self):
+        pass
+
+    def record_tokens(self, token_extractor):
+        pass
+
+    def record_cost(self, cost: float):
+        pass
+
+    def record_model(self, model: str):
+        pass
+
+    def record_prompt(self, prompt: str):
+        pass
+
+    def record_response_text(self, response: str):
+        pass
+
+    def update_metadata(self, metadata: dict[str, Any]):
+        pass
+
+    def record_error(self, error: str):
+        pass
+
+    def record_response(self, token_extractor, cost=0.0, model="unknown", success=True):
+        pass
+
+    def is_empty(self) -> bool:
+        return True
+
+    def send_metrics(self, pushgateway_url: str | None = None) -> bool:
+        return False
+
+    def send_metrics_sync(self, pushgateway_url: str | None = None) -> bool:
+        return False
+
+
+_NULL_TRACKER = _NullTracker()
 
 
 # Legacy compatibility function
@@ -348,6 +1124,9 @@ def send_agent_metrics(
     pushgateway_url: str = "http://localhost:7101",
 ) -> bool:
     """Legacy compatibility function - use track_ai_call() for new integrations"""
+    if not get_config().telemetry_enabled:
+        return False
+
     logger.warning(
         "Using legacy send_agent_metrics(). Consider upgrading to track_ai_call()."
     )
@@ -361,7 +1140,7 @@ def send_agent_metrics(
     tracker.model = model
     tracker.success = success
 
-    return tracker.send_metrics(pushgateway_url)
+    return tracker.send_metrics_sync(pushgateway_url)
 
 
 def show_help():
@@ -399,4 +1178,5 @@ if __name__ == "__main__":
             tracker.record_cost(0.001)
             tracker.record_model("test-model")
 
+        flush_metrics(timeout=10)
         print("✅ Telemetry test completed")
@@ -1,6 +1,8 @@
 import pytest
 
+from llm_cli_core import flush_metrics
 from llm_cli_core.config import reset_config_cache
+from llm_cli_core.models.pricing import reset_pricing_cache
 
 
 @pytest.fixture(autouse=True)
@@ -11,6 +13,10 @@ def telemetry_test_env(tmp_path, monkeypatch):
     monkeypatch.setenv("LLM_CACHE_DIR", str(cache_dir))
     monkeypatch.delenv("LLM_TELEMETRY_ENABLED", raising=False)
     monkeypatch.delenv("LLM_TELEMETRY_STORAGE_ENABLED", raising=False)
+    monkeypatch.delenv("LLM_TELEMETRY_SYNC", raising=False)
     reset_config_cache()
+    reset_pricing_cache()
     yield
+    flush_metrics(timeout=10)
     reset_config_cache()
+    reset_pricing_cache()
@@ -38,6 +38,7 @@ def _record(storage: LocalStorage, **kwargs):
             metadata={"project": get_config().project_name},
         )
     )
+    storage.flush()
 
 
 def test_build_cost_report_uses_pricing_when_cost_missing():
@@ -73,3 +74,60 @@ def test_build_cost_report_filters():
     assert report["total_calls"] == 1
     assert "git-info" in report["by_agent"]
     assert "doc-finder" not in report["by_agent"]
+
+
+def test_build_cost_report_uses_filters_changed_after_construction():
+    config = get_config()
+    storage = LocalStorage(config)
+    _record(storage, agent="doc-finder", success=True, cost_usd=0.1)
+    _record(storage, agent="git-info", success=False, cost_usd=0.2)
+
+    filters = CostFilters(agent="doc-finder")
+    filters.agent = "Git-Info"
+    report = build_cost_report(
+        config.resolve_telemetry_dir(),
+        days=30,
+        pricing=StubPricing({}),
+        filters=filters,
+    )
+
+    assert list(report["by_agent"]) == ["git-info"]
+
+
+def test_build_cost_report_sections_sorted_by_cost():
+    config = get_config()
+    storage = LocalStorage(config)
+    _record(storage, model="cheap-model", cost_usd=0.01, input_tokens=10, output_tokens=5)
+    _record(storage, model="pricey-model", cost_usd=0.5, input_tokens=20, output_tokens=10)
+    _record(storage, model="cheap-model", cost_usd=0.02, input_tokens=30, output_tokens=15)
+
+    report = build_cost_report(
+        config.resolve_telemetry_dir(),
+        days=30,
+        pricing=StubPricing({}),
+    )
+
+    assert list(report["by_model"]) == ["pricey-model", "cheap-model"]
+    cheap = report["by_model"]["cheap-model"]
+    assert cheap["calls"] == 2
+    assert cheap["cost_usd"] == 0.03
+    assert cheap["tokens"] == {"total": 300, "input": 40, "output": 20}
+    assert report["by_agent"]["doc-finder"]["calls"] == 3
+
+
+def test_build_cost_report_rounds_section_costs_once():
+    config = get_config()
+    storage = LocalStorage(config)
+    for _ in range(20):
+        _record(storage, cost_usd=4e-7)
+
+    report = build_cost_report(
+        config.resolve_telemetry_dir(),
+        days=30,
+        pricing=StubPricing({}),
+    )
+
+    # Rounding each update to six places would have kept these at zero.
+    assert report["by_agent"]["doc-finder"]["cost_usd"] == 0.000008
+    assert report["by_model"]["claude-3-5-haiku"]["cost_usd"] == 0.000008
+    assert report["total_cost"] == 0.000008
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "helpers" / "claude_metrics.py"
+
+
+@pytest.fixture(scope="module")
+def claude_metrics():
+    spec = importlib.util.spec_from_file_location("claude_metrics", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses resolves the defining module through sys.modules.
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        sys.modules.pop(spec.name, None)
+
+
+def test_load_records_reads_json_array_over_several_lines(claude_metrics, tmp_path):
+    path = tmp_path / "execution.json"
+    path.write_text('[\n  {"usage": {"input_tokens": 3}},\n  {"usage": {"input_tokens": 4}}\n]\n')
+
+    records = list(claude_metrics._load_records(path))
+
+    assert [r["usage"]["input_tokens"] for r in records] == [3, 4]
+
+
+def test_load_records_rejects_ndjson_opening_with_bracket_line(claude_metrics, tmp_path):
+    path = tmp_path / "execution.jsonl"
+    path.write_text('[\n{"usage": {"input_tokens": 3}}\n{"usage": {"input_tokens": 4}}\n')
+
+    with pytest.raises(claude_metrics.MetricsParseError):
+        list(claude_metrics._load_records(path))
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        (
+            b'{"model": "m-1", "usage": {"input_tokens": 3, "outputTokens": 5}, "extra": [1]}\n'
+            b'{"result": {"model": "m-2", "usage": {"input_tokens": 7}}, "note": "x"}\n'
+            b'{"metrics": {"input_tokens": 2, "output_tokens": 1}, "meta": {"model": "m-3"}}\n'
+        ),
+        (
+            b'[{"usage": {"inputTokens": 4, "output_tokens": 6}, "model": "m-4"},\n'
+            b' {"usage": {"input_tokens": "9"}, "model": null}, 3]\n'
+        ),
+    ],
+)
+def test_projected_decode_matches_full_decode(claude_metrics, tmp_path, monkeypatch, payload):
+    simdjson = pytest.importorskip("simdjson")
+    path = tmp_path / "execution.json"
+    path.write_bytes(payload)
+
+    monkeypatch.setattr(claude_metrics, "simdjson", simdjson)
+    projected = claude_metrics.collect_metrics_from_file(path)
+    monkeypatch.setattr(claude_metrics, "simdjson", None)
+    full = claude_metrics.collect_metrics_from_file(path)
+
+    assert projected == full
+    assert projected["in_tokens"] > 0
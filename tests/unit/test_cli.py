@@ -3,6 +3,9 @@ from __future__ import annotations
 import json
 from datetime import datetime, timezone
 
+import pytest
+
+from llm_cli_core import cli
 from llm_cli_core.cli import main
 from llm_cli_core.config import get_config
 from llm_cli_core.storage import LocalStorage, TelemetryRecord
@@ -33,6 +36,7 @@ def test_cli_costs_json_output(capsys):
     config = get_config()
     storage = LocalStorage(config)
     storage.record(_make_record())
+    storage.flush()
 
     exit_code = main(["costs", "--json"])
     assert exit_code == 0
@@ -43,10 +47,39 @@ def test_cli_costs_json_output(capsys):
     assert data["by_agent"]["doc-finder"]["calls"] == 1
 
 
+def test_cli_costs_json_writes_orjson_bytes(capsysbinary):
+    orjson = pytest.importorskip("orjson")
+    storage = LocalStorage(get_config())
+    storage.record(_make_record())
+    storage.flush()
+
+    assert main(["costs", "--json"]) == 0
+
+    out = capsysbinary.readouterr().out
+    report = orjson.loads(out)
+    assert report["total_calls"] == 1
+    assert out == orjson.dumps(
+        report, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+    )
+
+
+def test_cli_costs_json_without_orjson(monkeypatch, capsys):
+    monkeypatch.setattr(cli, "orjson", None)
+    storage = LocalStorage(get_config())
+    storage.record(_make_record())
+    storage.flush()
+
+    assert main(["costs", "--json"]) == 0
+
+    data = json.loads(capsys.readouterr().out)
+    assert data["total_calls"] == 1
+
+
 def test_cli_costs_table_output(capsys):
     config = get_config()
     storage = LocalStorage(config)
     storage.record(_make_record())
+    storage.flush()
 
     exit_code = main(["costs"])
     assert exit_code == 0
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone, timedelta
+from datetime import UTC, datetime, timedelta
+
+import httpx
 
 from llm_cli_core.config import get_config
 from llm_cli_core.models.pricing import ModelPricing, PricingCache
@@ -10,7 +12,7 @@ def test_pricing_cache_loads_and_uses_cache(monkeypatch):
     config = get_config()
     cache = PricingCache(config)
 
-    fetched_at = datetime.now(timezone.utc)
+    fetched_at = datetime.now(UTC)
 
     def fake_fetch(self):  # noqa: D401
         models = {
@@ -51,11 +53,11 @@ def test_pricing_cache_detects_stale(monkeypatch):
     config = get_config()
     cache = PricingCache(config)
 
-    old_time = datetime.now(timezone.utc) - timedelta(days=8)
+    old_time = datetime.now(UTC) - timedelta(days=8)
 
     def fake_fetch(self):
         models = {"gpt-4": ModelPricing(prompt=3e-6, completion=6e-6)}
-        return models, datetime.now(timezone.utc)
+        return models, datetime.now(UTC)
 
     cache._models = {"gpt-4": ModelPricing(prompt=3e-6, completion=6e-6)}
     cache._fetched_at = old_time
@@ -64,3 +66,72 @@ def test_pricing_cache_detects_stale(monkeypatch):
     cache.load()
     assert cache._fetched_at is not None
     assert cache._fetched_at > old_time
+
+
+def test_pricing_lookup_prefers_first_matching_model_and_tracks_reload(monkeypatch):
+    config = get_config()
+    cache = PricingCache(config)
+    fetched_at = datetime.now(UTC)
+
+    first = ModelPricing(prompt=1e-6, completion=2e-6)
+    second = ModelPricing(prompt=5e-6, completion=6e-6)
+    cache._models = {"vendor/claude-3-5-haiku": first, "other.claude-3-5-haiku": second}
+    cache._fetched_at = fetched_at
+
+    assert cache._lookup_model(cache._models, "claude-3-5-haiku-20241022") is first
+
+    def fake_fetch(self):
+        return {"gpt-4o": ModelPricing(prompt=3e-6, completion=6e-6)}, fetched_at
+
+    monkeypatch.setattr(PricingCache, "_fetch_remote", fake_fetch, raising=False)
+    models = cache.load(force=True)
+    assert cache._lookup_model(models, "claude-3-5-haiku-20241022") is None
+    assert cache._lookup_model(models, "openai/gpt-4o") is models["gpt-4o"]
+
+
+def test_pricing_estimate_memoises_resolution_until_reload(monkeypatch):
+    config = get_config()
+    cache = PricingCache(config)
+    fetched_at = datetime.now(UTC)
+
+    def fake_fetch(self):
+        return {"gpt-4": ModelPricing(prompt=3e-6, completion=6e-6)}, fetched_at
+
+    monkeypatch.setattr(PricingCache, "_fetch_remote", fake_fetch, raising=False)
+    cache.load(force=True)
+
+    lookups = []
+    original = PricingCache._lookup_model
+
+    def counting_lookup(self, models, model):
+        lookups.append(model)
+        return original(self, models, model)
+
+    monkeypatch.setattr(PricingCache, "_lookup_model", counting_lookup)
+
+    for _ in range(3):
+        assert cache.estimate_cost("gpt-4", input_tokens=10, output_tokens=10) == 9e-5
+    assert lookups == ["gpt-4"]
+
+    cache.load(force=True)
+    cache.estimate_cost("gpt-4", input_tokens=10, output_tokens=10)
+    assert lookups == ["gpt-4", "gpt-4"]
+
+
+def test_pricing_fetch_remote_merges_both_sources(monkeypatch):
+    def handler(request):
+        if request.url.host == "openrouter.ai":
+            return httpx.Response(
+                200,
+                json={"data": [{"id": "Anthropic/Claude-3", "pricing": {"prompt": "0.000003"}}]},
+            )
+        return httpx.Response(200, json={"gpt-4": {"input_cost_per_token": 3e-6}, "empty": {}})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(PricingCache, "_client", client)
+
+    cache = PricingCache(get_config())
+    models, _ = cache._fetch_remote()
+    assert cache._get_client() is client
+    assert set(models) == {"gpt-4", "anthropic/claude-3"}
+    assert models["anthropic/claude-3"].source == "openrouter"
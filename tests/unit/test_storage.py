@@ -1,17 +1,40 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime, timezone
+from datetime import UTC, datetime, timedelta, timezone
 
-from llm_cli_core.config import get_config
+import pytest
+
+from llm_cli_core.config import get_config, reset_config_cache
 from llm_cli_core.storage import LocalStorage, TelemetryRecord
+from llm_cli_core.storage.readers import _parse_timestamp, iter_telemetry_records
+
+
+def _make_record(timestamp: datetime, agent_name: str = "test-agent") -> TelemetryRecord:
+    return TelemetryRecord(
+        timestamp=timestamp,
+        agent_name=agent_name,
+        operation="test-operation",
+        model="claude-3-5-haiku",
+        session_id="session-123",
+        user_id="user-123",
+        duration_ms=100,
+        total_tokens=10,
+        input_tokens=6,
+        output_tokens=4,
+        cost_usd=0.001,
+        success=True,
+        prompt_hash=None,
+        response_hash=None,
+        metadata={},
+    )
 
 
 def test_local_storage_persists_record(tmp_path):
     config = get_config()
     storage = LocalStorage(config)
 
-    timestamp = datetime.now(timezone.utc)
+    timestamp = datetime.now(UTC)
     record = TelemetryRecord(
         timestamp=timestamp,
         agent_name="test-agent",
@@ -31,6 +54,7 @@ def test_local_storage_persists_record(tmp_path):
     )
 
     storage.record(record)
+    storage.flush()
 
     day_dir = config.resolve_telemetry_dir() / timestamp.strftime("%Y-%m-%d")
     telemetry_file = day_dir / "telemetry.jsonl"
@@ -44,8 +68,265 @@ def test_local_storage_persists_record(tmp_path):
     assert payload["tokens"]["total"] == 150
     assert payload["metadata"]["custom"] == "value"
 
+    storage.materialize_summary()
     assert summary_file.exists()
     summary = json.loads(summary_file.read_text(encoding="utf-8"))
     assert summary["total_calls"] == 1
     assert summary["total_cost"] > 0
     assert summary["by_agent"]["test-agent"]["calls"] == 1
+
+
+def test_iter_telemetry_records_window_spans_days():
+    config = get_config()
+    storage = LocalStorage(config)
+    day = datetime(2025, 3, 10, tzinfo=UTC)
+    timestamps = [
+        day + timedelta(hours=1),  # before window start
+        day + timedelta(hours=20),
+        day + timedelta(days=1, hours=3),
+        day + timedelta(days=2, hours=2),
+        day + timedelta(days=2, hours=23),  # after window end
+    ]
+    for index, timestamp in enumerate(timestamps):
+        storage.record(_make_record(timestamp, agent_name=f"agent-{index}"))
+    storage.flush()
+
+    # A non-UTC window must still map onto the UTC-named day directories.
+    tz = timezone(timedelta(hours=5))
+    start = (day + timedelta(hours=12)).astimezone(tz)
+    end = (day + timedelta(days=2, hours=12)).astimezone(tz)
+    agents = [
+        r["agent_name"]
+        for r in iter_telemetry_records(config.resolve_telemetry_dir(), start, end)
+    ]
+
+    assert agents == ["agent-1", "agent-2", "agent-3"]
+
+
+def test_iter_telemetry_records_handles_out_of_order_day_files():
+    # Buffered flushes from concurrent writers interleave within a day file.
+    config = get_config()
+    storage = LocalStorage(config)
+    base = datetime(2025, 3, 10, 10, 0, 0, tzinfo=UTC)
+    for second in (5, 1, 2, 6, 3, 8):
+        storage.record(_make_record(base + timedelta(seconds=second), agent_name=f"agent-{second}"))
+    storage.flush()
+
+    def agents(start, end):
+        return sorted(
+            r["agent_name"]
+            for r in iter_telemetry_records(config.resolve_telemetry_dir(), start, end)
+        )
+
+    assert agents(base + timedelta(seconds=3), base + timedelta(seconds=9)) == [
+        "agent-3",
+        "agent-5",
+        "agent-6",
+        "agent-8",
+    ]
+    assert agents(base, base + timedelta(seconds=4)) == ["agent-1", "agent-2", "agent-3"]
+
+
+def test_parse_timestamp_fast_path_matches_fromisoformat():
+    values = [
+        datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=UTC).isoformat(),
+        datetime(2024, 5, 6, 7, 8, 9, tzinfo=UTC).isoformat(),
+        datetime(2024, 5, 6, 7, 8, 9, 5, tzinfo=timezone(timedelta(hours=2))).isoformat(),
+    ]
+    for value in values:
+        parsed = _parse_timestamp(value)
+        assert parsed == datetime.fromisoformat(value)
+        assert parsed.utcoffset() == datetime.fromisoformat(value).utcoffset()
+    assert _parse_timestamp("2024-05-06T07:08:09Z") == datetime(
+        2024, 5, 6, 7, 8, 9, tzinfo=UTC
+    )
+
+
+def test_summary_merges_pending_tallies_incrementally():
+    config = get_config()
+    storage = LocalStorage(config)
+    timestamp = datetime.now(UTC)
+
+    storage.record(_make_record(timestamp, agent_name="agent-a"))
+    storage.record(_make_record(timestamp, agent_name="agent-b"))
+    first = storage.materialize_summary()
+    assert first["total_calls"] == 2
+
+    storage.record(_make_record(timestamp, agent_name="agent-a"))
+    storage.flush()
+    # A second storage instance (e.g. another process) sees the merged totals.
+    second = LocalStorage(config).materialize_summary()
+    assert second["total_calls"] == 3
+    assert second["by_agent"]["agent-a"]["calls"] == 2
+    assert second["total_tokens"]["total"] == 30
+    assert LocalStorage(config).materialize_summary()["total_calls"] == 3
+
+
+def test_record_batch_appends_days_and_updates_summary_once():
+    config = get_config()
+    storage = LocalStorage(config)
+    day = datetime(2025, 3, 10, tzinfo=UTC)
+    records = [
+        _make_record(day + timedelta(hours=hours), agent_name=f"agent-{hours % 2}")
+        for hours in (1, 5, 26, 30, 31)
+    ]
+
+    storage.record_batch(records)
+
+    base_dir = config.resolve_telemetry_dir()
+    first_day = (base_dir / "2025-03-10" / "telemetry.jsonl").read_text().splitlines()
+    second_day = (base_dir / "2025-03-11" / "telemetry.jsonl").read_text().splitlines()
+    assert len(first_day) == 2 and len(second_day) == 3
+
+    summary = json.loads((base_dir / "summary.json").read_text())
+    assert summary["total_calls"] == 5
+    assert summary["by_agent"]["agent-0"]["calls"] == 2
+    assert summary["by_agent"]["agent-1"]["calls"] == 3
+    assert summary["total_tokens"]["total"] == 50
+
+
+def test_local_storage_buffers_until_threshold(monkeypatch):
+    monkeypatch.setenv("LLM_TELEMETRY_FLUSH_RECORDS", "4")
+    reset_config_cache()
+    config = get_config()
+    storage = LocalStorage(config)
+    timestamp = datetime.now(UTC)
+    telemetry_file = (
+        config.resolve_telemetry_dir() / timestamp.strftime("%Y-%m-%d") / "telemetry.jsonl"
+    )
+
+    for _ in range(3):
+        storage.record(_make_record(timestamp))
+    assert not telemetry_file.exists()
+    storage.record(_make_record(timestamp))
+    assert len(telemetry_file.read_text(encoding="utf-8").splitlines()) == 4
+
+    storage.record(_make_record(timestamp))
+    storage.close()
+    assert len(telemetry_file.read_text(encoding="utf-8").splitlines()) == 5
+    summary = json.loads(storage.summary_path.read_text(encoding="utf-8"))
+    assert summary["total_calls"] == 5
+
+
+def test_local_storage_writes_summary_after_interval(monkeypatch):
+    from llm_cli_core.storage import local
+
+    monkeypatch.setattr(local, "SUMMARY_MATERIALIZE_INTERVAL", 0.0)
+    config = get_config()
+    storage = LocalStorage(config)
+
+    storage.record(_make_record(datetime.now(UTC)))
+
+    summary = json.loads(storage.summary_path.read_text(encoding="utf-8"))
+    assert summary["total_calls"] == 1
+
+
+def test_local_storage_reuses_append_descriptors_within_a_day():
+    config = get_config()
+    storage = LocalStorage(config)
+    day = datetime(2025, 3, 10, 12, tzinfo=UTC)
+
+    storage.record(_make_record(day))
+    storage.flush()
+    fds = dict(storage._buffer._fds)
+    assert fds  # small batches use cached O_APPEND descriptors
+
+    storage.record(_make_record(day))
+    storage.flush()
+    assert storage._buffer._fds == fds
+
+    storage.record(_make_record(day + timedelta(days=1)))
+    assert not storage._buffer._fds  # rolled over: previous day's descriptors closed
+    storage.close()
+
+    rows = list(
+        iter_telemetry_records(config.resolve_telemetry_dir(), day, day + timedelta(days=2))
+    )
+    assert len(rows) == 3
+
+
+def test_old_days_are_compacted_and_still_readable(monkeypatch):
+    pytest.importorskip("zstandard")
+    monkeypatch.setenv("LLM_TELEMETRY_COMPACT_AFTER_DAYS", "2")
+    reset_config_cache()
+    config = get_config()
+    storage = LocalStorage(config)
+    day = datetime(2025, 3, 10, tzinfo=UTC)
+    for hours in (1, 2, 3):
+        storage.record(_make_record(day + timedelta(hours=hours), agent_name=f"agent-{hours}"))
+    # The first write of a day more than two days later compacts the old day.
+    storage.record(_make_record(day + timedelta(days=3), agent_name="agent-later"))
+    storage.flush()
+
+    old_dir = config.resolve_telemetry_dir() / "2025-03-10"
+    assert not (old_dir / "telemetry.jsonl").exists()
+    assert (old_dir / "telemetry.jsonl.zst").exists()
+
+    # Backfilled lines land in a fresh plain file and are appended as a new frame.
+    storage.record_batch([_make_record(day + timedelta(hours=4), agent_name="agent-4")])
+    start = day + timedelta(hours=2)
+    end = day + timedelta(hours=5)
+    agents = [
+        r["agent_name"]
+        for r in iter_telemetry_records(config.resolve_telemetry_dir(), start, end)
+    ]
+    assert agents == ["agent-2", "agent-3", "agent-4"]
+
+    assert storage.compact_day(day.date()) is True
+    assert not (old_dir / "telemetry.jsonl").exists()
+    agents = [
+        r["agent_name"]
+        for r in iter_telemetry_records(config.resolve_telemetry_dir(), start, end)
+    ]
+    assert agents == ["agent-2", "agent-3", "agent-4"]
+
+
+def test_old_days_are_not_compacted_by_default():
+    config = get_config()
+    storage = LocalStorage(config)
+    day = datetime(2025, 3, 10, tzinfo=UTC)
+    storage.record(_make_record(day, agent_name="agent-old"))
+    storage.record(_make_record(day + timedelta(days=3), agent_name="agent-later"))
+    storage.flush()
+
+    old_dir = config.resolve_telemetry_dir() / "2025-03-10"
+    assert (old_dir / "telemetry.jsonl").exists()
+    assert not (old_dir / "telemetry.jsonl.zst").exists()
+
+
+def test_concurrent_compaction_of_a_day_does_not_duplicate_records():
+    pytest.importorskip("zstandard")
+    fcntl = pytest.importorskip("fcntl")
+    import threading
+    import time
+
+    config = get_config()
+    storage = LocalStorage(config)
+    day = datetime(2025, 3, 10, tzinfo=UTC)
+    storage.record_batch([_make_record(day + timedelta(hours=h)) for h in (1, 2)])
+    storage.flush()
+    source = config.resolve_telemetry_dir() / "2025-03-10" / "telemetry.jsonl"
+
+    errors = []
+
+    def compact():
+        try:
+            LocalStorage(config).compact_day(day.date())
+        except Exception as exc:  # noqa: BLE001  # pragma: no cover - asserted below
+            errors.append(exc)
+
+    # Both compactions open the file, then queue behind the held lock.
+    with source.open("rb") as held:
+        fcntl.flock(held.fileno(), fcntl.LOCK_EX)
+        workers = [threading.Thread(target=compact) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.2)
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert errors == []
+    records = list(
+        iter_telemetry_records(config.resolve_telemetry_dir(), day, day + timedelta(days=1))
+    )
+    assert len(records) == 2
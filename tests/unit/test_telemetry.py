@@ -1,12 +1,16 @@
 """Tests for telemetry functionality"""
+import time
 from unittest.mock import Mock, patch
+
 from llm_cli_core import (
-    track_ai_call,
-    OpenRouterTokens,
+    AITelemetryTracker,
     AnthropicTokens,
     OpenAITokens,
-    AITelemetryTracker,
+    OpenRouterTokens,
+    SessionInfo,
     TokenData,
+    flush_metrics,
+    track_ai_call,
 )
 
 
@@ -102,27 +106,43 @@ def test_telemetry_tracker_record_methods():
     assert tracker.model == "gpt-4"
 
 
-@patch('requests.post')
-def test_send_metrics(mock_post):
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics(mock_pool):
     """Test sending metrics to pushgateway"""
-    mock_post.return_value.status_code = 200
+    mock_post = mock_pool.request
+    mock_post.return_value.status = 200
 
     tracker = AITelemetryTracker("test-agent", "test-op")
     tracker.start()
-    result = tracker.send_metrics()
+    result = tracker.send_metrics_sync()
 
     assert result is True
     mock_post.assert_called_once()
 
 
-@patch('requests.post')
-def test_send_metrics_failure(mock_post):
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics_posts_in_background(mock_pool):
+    """Test send_metrics queues the push and the worker delivers it"""
+    mock_post = mock_pool.request
+    mock_post.return_value.status = 200
+
+    tracker = AITelemetryTracker("test-agent", "test-op")
+    tracker.start()
+    assert tracker.send_metrics() is True
+
+    assert flush_metrics(timeout=5) is True
+    mock_post.assert_called_once()
+    assert b"ai_agent_usage_total" in mock_post.call_args.kwargs["body"]
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics_failure(mock_pool):
     """Test handling of metrics send failure"""
-    mock_post.return_value.status_code = 500
+    mock_pool.request.return_value.status = 500
 
     tracker = AITelemetryTracker("test-agent", "test-op")
     tracker.start()
-    result = tracker.send_metrics()
+    result = tracker.send_metrics_sync()
 
     assert result is False
 
@@ -131,8 +151,9 @@ def test_legacy_send_agent_metrics():
     """Test legacy send_agent_metrics function"""
     from llm_cli_core import send_agent_metrics
 
-    with patch('requests.post') as mock_post:
-        mock_post.return_value.status_code = 200
+    with patch('llm_cli_core.telemetry.core._POOL') as mock_pool:
+        mock_post = mock_pool.request
+        mock_post.return_value.status = 200
 
         result = send_agent_metrics(
             agent_name="test-agent",
@@ -148,3 +169,387 @@ def test_legacy_send_agent_metrics():
 
         assert result is True
         mock_post.assert_called_once()
+
+
+def test_session_info_detect_is_cached_per_hour(monkeypatch):
+    """Fallback sessions are reused within an hour; explicit IDs are not cached"""
+    monkeypatch.delenv("CLAUDE_SESSION_ID", raising=False)
+    first = SessionInfo.detect()
+    assert first.session_id.startswith("env-")
+    assert SessionInfo.detect() is first
+    assert first.start_time == first.session_start_time
+
+    monkeypatch.setenv("CLAUDE_SESSION_ID", "explicit-session")
+    explicit = SessionInfo.detect()
+    assert explicit.session_id == "explicit-session"
+    assert SessionInfo.detect() is not explicit
+
+
+def test_session_start_time_is_formatted_once_per_second(monkeypatch):
+    """The start-time string is only rebuilt when the second rolls over"""
+    from llm_cli_core.telemetry import core
+
+    monkeypatch.setattr(core.time, "time", lambda: 1_700_000_000.25)
+    first = core._local_time_str()
+    assert first == time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(1_700_000_000))
+    assert core._local_time_str() is first
+
+    monkeypatch.setattr(core.time, "time", lambda: 1_700_000_001.0)
+    assert core._local_time_str() != first
+
+
+def test_session_info_follows_chdir(monkeypatch, tmp_path):
+    """Changing directory (which leaves $PWD alone) refreshes the session and branch"""
+    monkeypatch.delenv("CLAUDE_SESSION_ID", raising=False)
+    before = AITelemetryTracker("test-agent", "test-op")
+
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/chdir-branch\n")
+    monkeypatch.chdir(tmp_path)
+    after = AITelemetryTracker("test-agent", "test-op")
+
+    assert after.session_info is not before.session_info
+    assert after.session_info.working_directory == str(tmp_path)
+    assert after._collect_metadata()["git_branch"] == "chdir-branch"
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics_relabels_after_model_change(mock_pool):
+    """Cached label blocks follow the recorded model"""
+    mock_post = mock_pool.request
+    mock_post.return_value.status = 200
+
+    tracker = AITelemetryTracker("test-agent", "test-op")
+    tracker.start()
+    tracker.send_metrics_sync()
+    tracker.record_model("gpt-4")
+    tracker.send_metrics_sync()
+
+    first, second = (call.kwargs["body"] for call in mock_post.call_args_list)
+    assert b'model="unknown"' in first
+    assert b'model="gpt-4"' in second and b'model="unknown"' not in second
+
+
+def test_token_functions_feed_record_tokens():
+    """Function extractors return TokenData that record_tokens accepts directly"""
+    from llm_cli_core import openrouter_tokens
+
+    tracker = AITelemetryTracker("test-agent", "test-op")
+    response = {"usage": {"total_tokens": 100, "prompt_tokens": 60, "completion_tokens": 40}}
+    tokens = openrouter_tokens(response)
+
+    assert tokens == OpenRouterTokens(response).data
+    tracker.record_tokens(tokens)
+    assert tracker.tokens == TokenData(total=100, input=60, output=40)
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics_escapes_labels_and_grouping_key(mock_pool):
+    """Quotes, backslashes and slashes in names cannot corrupt the push"""
+    mock_post = mock_pool.request
+    mock_post.return_value.status = 200
+
+    tracker = AITelemetryTracker('team/"quoted"\\agent', "test-op")
+    tracker.start()
+    tracker.send_metrics_sync()
+
+    url = mock_post.call_args.args[1]
+    body = mock_post.call_args.kwargs["body"].decode()
+    assert "/agent@base64/" in url
+    assert 'agent_name="team/\\"quoted\\"\\\\agent"' in body
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics_persists_in_background(mock_pool):
+    """The local storage write happens on the worker, after the push"""
+    mock_pool.request.return_value.status = 200
+
+    tracker = AITelemetryTracker("test-agent", "test-op")
+    tracker.start()
+    tracker.record_model("gpt-4")
+    assert tracker.send_metrics() is True
+    assert flush_metrics(timeout=5) is True
+    tracker.storage.flush()
+
+    summary = tracker.storage.materialize_summary()
+    assert summary["by_model"]["gpt-4"]["calls"] == 1
+
+
+def test_background_records_are_written_when_the_process_exits(tmp_path):
+    """Exiting without flush_metrics still stores queued calls, gateway or not"""
+    import json
+    import os
+    import subprocess
+    import sys
+
+    telemetry_dir = tmp_path / "exit-telemetry"
+    env = dict(
+        os.environ,
+        LLM_TELEMETRY_DIR=str(telemetry_dir),
+        LLM_PUSHGATEWAY_URL="http://127.0.0.1:1",
+    )
+    env.pop("LLM_TELEMETRY_SYNC", None)
+    code = (
+        "from llm_cli_core import track_ai_call\n"
+        "for _ in range(3):\n"
+        "    with track_ai_call('exit-agent', 'op'):\n"
+        "        pass\n"
+    )
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=60)
+
+    lines = [
+        line
+        for path in telemetry_dir.rglob("telemetry.jsonl")
+        for line in path.read_text().splitlines()
+    ]
+    assert len(lines) == 3
+    summary = json.loads((telemetry_dir / "summary.json").read_text())
+    assert summary["total_calls"] == 3
+
+
+def test_queued_records_are_written_at_exit_behind_a_hanging_gateway(tmp_path):
+    """Calls still queued when the gateway never answers are stored at exit"""
+    import os
+    import socket
+    import subprocess
+    import sys
+
+    telemetry_dir = tmp_path / "hang-telemetry"
+    # Accepts connections (via the listen backlog) but never responds.
+    with socket.socket() as gateway:
+        gateway.bind(("127.0.0.1", 0))
+        gateway.listen()
+        port = gateway.getsockname()[1]
+        env = dict(
+            os.environ,
+            LLM_TELEMETRY_DIR=str(telemetry_dir),
+            LLM_PUSHGATEWAY_URL=f"http://127.0.0.1:{port}",
+        )
+        env.pop("LLM_TELEMETRY_SYNC", None)
+        code = (
+            "from llm_cli_core import track_ai_call\n"
+            "for _ in range(150):\n"
+            "    with track_ai_call('hang-agent', 'op'):\n"
+            "        pass\n"
+        )
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=60)
+
+    lines = [
+        line
+        for path in telemetry_dir.rglob("telemetry.jsonl")
+        for line in path.read_text().splitlines()
+    ]
+    assert len(lines) == 150
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_empty_calls_are_not_stored_when_opted_out(mock_pool, monkeypatch):
+    """LLM_TELEMETRY_TRACK_EMPTY=0 still pushes but skips storing no-signal calls"""
+    from llm_cli_core.config import reset_config_cache
+
+    mock_pool.request.return_value.status = 200
+    monkeypatch.setenv("LLM_TELEMETRY_TRACK_EMPTY", "0")
+    reset_config_cache()
+
+    with track_ai_call("test-agent", "skipped") as tracker:
+        assert tracker.is_empty()
+    with track_ai_call("test-agent", "answered") as tracker:
+        tracker.record_tokens(TokenData(total=10, input=6, output=4))
+    assert flush_metrics(timeout=5) is True
+    assert mock_pool.request.called
+
+    from llm_cli_core.storage.readers import iter_last_n_days
+
+    tracker.storage.flush()
+    rows = list(iter_last_n_days(tracker.storage.base_dir, 1))
+    assert [r["operation"] for r in rows] == ["answered"]
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_send_metrics_sync_flag_posts_inline(mock_pool, monkeypatch):
+    """LLM_TELEMETRY_SYNC makes send_metrics wait for the response"""
+    from llm_cli_core.config import reset_config_cache
+
+    monkeypatch.setenv("LLM_TELEMETRY_SYNC", "true")
+    reset_config_cache()
+    mock_pool.request.return_value.status = 500
+
+    tracker = AITelemetryTracker("test-agent", "test-op")
+    tracker.start()
+    assert tracker.send_metrics() is False
+    mock_pool.request.assert_called_once()
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_background_pushes_coalesce_per_grouping_key(mock_pool):
+    """Queued calls sharing agent/session/user become one POST with summed samples"""
+    mock_post = mock_pool.request
+    mock_post.return_value.status = 200
+
+    for agent_name in ("agent-a", "agent-a", "agent-a", "agent-b"):
+        tracker = AITelemetryTracker(agent_name, "test-op")
+        tracker.start()
+        tracker.record_tokens(TokenData(total=10, input=6, output=4))
+        tracker.send_metrics()
+    assert flush_metrics(timeout=5) is True
+
+    bodies = {
+        call.args[1].split("/agent/")[1].split("/")[0]: call.kwargs["body"].decode()
+        for call in mock_post.call_args_list
+    }
+    assert set(bodies) == {"agent-a", "agent-b"}
+    assert 'ai_agent_tokens_total{agent_name="agent-a",model="unknown",user=' in bodies["agent-a"]
+    assert "} 30\n" in bodies["agent-a"]
+    assert ',success="True",' in bodies["agent-a"] and "} 3\n" in bodies["agent-a"]
+
+
+def test_git_branch_detection_is_cached(monkeypatch, tmp_path):
+    """HEAD is read without running git, once per working directory within the TTL"""
+    from llm_cli_core.telemetry import core
+
+    (tmp_path / ".git").mkdir()
+    head = tmp_path / ".git" / "HEAD"
+    head.write_text("ref: refs/heads/feature/x\n")
+    monkeypatch.setattr(core, "_GIT_BRANCH_CACHE", {})
+    monkeypatch.chdir(tmp_path)
+    with patch("llm_cli_core.telemetry.core.subprocess.run") as mock_run:
+        assert AITelemetryTracker._detect_git_branch() == "feature/x"
+        head.write_text("ref: refs/heads/main\n")
+        assert AITelemetryTracker._detect_git_branch() == "feature/x"
+    mock_run.assert_not_called()
+
+
+def test_git_branch_follows_worktree_gitdir(tmp_path):
+    """A .git file is followed to its git dir; detached heads have no branch"""
+    gitdir = tmp_path / "main" / ".git" / "worktrees" / "wt"
+    gitdir.mkdir(parents=True)
+    (gitdir / "HEAD").write_text("ref: refs/heads/wt-branch\n")
+    worktree = tmp_path / "wt"
+    (worktree / "src").mkdir(parents=True)
+    (worktree / ".git").write_text("gitdir: ../main/.git/worktrees/wt\n")
+
+    assert AITelemetryTracker._read_git_branch(str(worktree / "src")) == "wt-branch"
+    (gitdir / "HEAD").write_text("0123456789abcdef0123456789abcdef01234567\n")
+    assert AITelemetryTracker._read_git_branch(str(worktree)) is None
+
+
+def test_hash_text_defaults_to_blake2b_with_sha256_opt_out():
+    """Prompt hashes use blake2b unless sha256 is configured"""
+    import hashlib
+
+    assert AITelemetryTracker._hash_text(None) is None
+    assert AITelemetryTracker._hash_text("hello") == (
+        "blake2b:" + hashlib.blake2b(b"hello", digest_size=16).hexdigest()
+    )
+    assert AITelemetryTracker._hash_text(b"hello") == AITelemetryTracker._hash_text("hello")
+    assert AITelemetryTracker._hash_text("hello", "sha256") == (
+        "sha256:" + hashlib.sha256(b"hello").hexdigest()
+    )
+
+
+def test_hash_text_reuses_digest_for_repeated_text():
+    """Resent prompts are served from the digest cache"""
+    from llm_cli_core.telemetry.core import _hash_digest
+
+    _hash_digest.cache_clear()
+    prompt = "retry me " * 1000
+    first = AITelemetryTracker._hash_text(prompt)
+    assert AITelemetryTracker._hash_text("".join(["retry me "] * 1000)) == first
+    assert _hash_digest.cache_info().hits == 1
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_dispatcher_ring_drops_oldest_and_reports_count(mock_pool):
+    """Overrunning the ring sheds the oldest push, counts it and still persists it"""
+    from llm_cli_core.telemetry.core import _MetricsDispatcher
+
+    mock_post = mock_pool.request
+    mock_post.return_value.status = 200
+    dispatcher = _MetricsDispatcher(capacity=2, flush_interval=60)
+    persisted = []
+
+    for index in range(3):
+        assert dispatcher.submit(
+            "http://gw/metrics/job/ai_agents/agent/a/timestamp/",
+            [("ai_agent_usage_total{}", 1)],
+            lambda index=index: persisted.append(index),
+        )
+    assert dispatcher.flush(timeout=5) is True
+
+    assert dispatcher.dropped == 1
+    assert persisted == [0, 1, 2]
+    body = mock_post.call_args.kwargs["body"].decode()
+    assert "ai_agent_usage_total{} 2\n" in body
+    assert "ai_agent_telemetry_dropped_total 1\n" in body
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_track_ai_call_reuses_pooled_trackers(mock_pool):
+    """Trackers are recycled per thread and reset between calls"""
+    mock_pool.request.return_value.status = 200
+
+    with track_ai_call("agent-a", "op-a") as first:
+        first.record_model("gpt-4")
+        first.update_metadata({"ticket": "A-1"})
+        first.record_prompt("hello")
+    with track_ai_call("agent-b", "op-b") as second:
+        assert second is first
+        assert not hasattr(second, "__dict__")
+        assert second.agent_name == "agent-b"
+        assert second.model == "unknown"
+        assert "ticket" not in second.metadata
+        assert second.metadata["project"] == second.config.project_name
+        assert second.prompt_text is None
+    assert flush_metrics(timeout=5) is True
+
+    from llm_cli_core.storage.readers import iter_last_n_days
+
+    second.storage.flush()
+    rows = list(iter_last_n_days(second.storage.base_dir, 1))
+    assert [(r["agent_name"], r["model"]) for r in rows] == [
+        ("agent-a", "gpt-4"),
+        ("agent-b", "unknown"),
+    ]
+    assert rows[0]["metadata"]["ticket"] == "A-1"
+    assert rows[0]["prompt_hash"].startswith("blake2b:")
+    # The reused tracker carries nothing over from the first call.
+    assert set(rows[1]["metadata"]) <= {
+        "project",
+        "working_directory",
+        "session_start",
+        "git_branch",
+    }
+    assert rows[1]["prompt_hash"] is None
+
+
+def test_tracker_creates_storage_lazily():
+    """LocalStorage is built on first use and shared by trackers of one config"""
+    with patch("llm_cli_core.telemetry.core.LocalStorage") as mock_storage:
+        tracker = AITelemetryTracker("test-agent", "test-op")
+        mock_storage.assert_not_called()
+        assert tracker.storage is tracker.storage
+        assert AITelemetryTracker("other-agent", "op").storage is tracker.storage
+    mock_storage.assert_called_once()
+
+
+@patch('llm_cli_core.telemetry.core._POOL')
+def test_disabled_telemetry_hands_out_null_tracker(mock_pool, monkeypatch, tmp_path):
+    """LLM_TELEMETRY_ENABLED=0 skips tracking, pushes and storage entirely"""
+    from llm_cli_core.config import reset_config_cache
+    from llm_cli_core.telemetry.core import send_agent_metrics
+
+    monkeypatch.setenv("LLM_TELEMETRY_ENABLED", "0")
+    reset_config_cache()
+
+    with track_ai_call("test-agent", "test-op") as tracker:
+        assert not isinstance(tracker, AITelemetryTracker)
+        tracker.record_tokens(TokenData(total=10, input=6, output=4))
+        tracker.record_model("gpt-4")
+        tracker.update_metadata({"k": "v"})
+        tracker.success = False
+    assert tracker.metadata == {}
+
+    assert send_agent_metrics("test-agent", "legacy", 5) is False
+    flush_metrics(timeout=5)
+    mock_pool.request.assert_not_called()
+    assert not (tmp_path / "telemetry").exists()